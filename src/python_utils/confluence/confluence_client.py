@@ -26,6 +26,27 @@ class ConfluenceClient:
 
         return {**general_config, **config}
 
+    def get_page_version(self, page_id: str) -> None | Dict:
+        # The version of the page is cheap to load. It identifies the config without loading the page content.
+        if self.test_mode:
+            return None
+
+        url = f"{self.hostname}/rest/api/content/{page_id}?expand=version"
+
+        headers = {
+            "Authorization": f"Bearer {self.access_token}"
+        }
+
+        response = requests.get(url, headers=headers)
+
+        if response.status_code != 200:
+            raise Exception(
+                f'Failed to load page version: {response.status_code} {response.text}')
+
+        version = response.json()["version"]
+
+        return {"number": version["number"], "when": version.get("when")}
+
     def get_page_xml_content(self, page_id: str) -> str:
 
         url = f"{self.hostname}/rest/api/content/{page_id}?expand=body.storage"
@@ -1,7 +1,7 @@
 from flask import Blueprint
 
 from python_utils.confluence.confluence_client import ConfluenceClient
-from python_utils.flask.endpoint import response_json
+from python_utils.flask.endpoint import response_json, response_not_modified
 from python_utils.env import inject_environment
 
 
@@ -22,9 +22,19 @@ confluence_client = create_confluence_client()
 @confluence_endpoint.route('/config/<config_id>')
 def get_board_config(config_id):
     try:
-        config = confluence_client.get_config(get_config_page_id(), config_id)
+        page_id = get_config_page_id()
+        page_version = confluence_client.get_page_version(page_id)
+        if not page_version:
+            return response_json(confluence_client.get_config(page_id, config_id))
 
-        return response_json(config)
+        version = f"confluence|{page_id}|{config_id}|{page_version['number']}"
+        not_modified_response = response_not_modified(version, page_version["when"])
+        if not_modified_response:
+            return not_modified_response
+
+        config = confluence_client.get_config(page_id, config_id)
+
+        return response_json(config, version=version, last_modified=page_version["when"])
     except Exception as e:
         return response_json({"error": str(e)}), 400
 
@@ -1,7 +1,211 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List
+
+from flask import Response, current_app, make_response, request
 from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+from flask_caching.backends.simplecache import SimpleCache
+
+from python_utils.flask.compression import negotiate_encoding
+from python_utils.flask.tiered_cache import GlobalDataStoreCache, SHARED_TIER_FILESYSTEM, SHARED_TIER_GLOBAL_DATA_STORE
+
+DEFAULT_CACHE_CONFIG = {'CACHE_TYPE': "SimpleCache", 'CACHE_DEFAULT_TIMEOUT': 300}
+TIERED_CACHE_TYPE = "python_utils.flask.tiered_cache.TieredCache"
+
+cache = Cache(config=DEFAULT_CACHE_CONFIG)
+# The generations of the tags are stored apart from the responses, which the cache evicts beyond its threshold.
+# None: in the cache itself
+tag_cache: BaseCache | None = None
+
+# An expired response is kept this long. It is sent, while a single request recomputes it.
+STALE_TIME_TO_LIVE = 60
+RECOMPUTE_LOCK_TIMEOUT = 30
+
+
+def init_cache(app, config: Dict = None):
+    # The CACHE_ settings of the app and the config replace the defaults. A cache shared by all workers:
+    # CACHE_TYPE: TIERED_CACHE_TYPE, CACHE_SHARED_TIER: "filesystem" with CACHE_DIR or "global_data_store",
+    # CACHE_THRESHOLD: entries of the shared tier, CACHE_LOCAL_MAX_SIZE: bytes and CACHE_LOCAL_TIMEOUT: seconds
+    # of the in-process tier.
+    # The tag generations are stored in CACHE_TAG_DIR, by default next to CACHE_DIR.
+    global tag_cache
+    app_config = {key: value for key, value in app.config.items() if key.startswith("CACHE_")}
+    config = {**DEFAULT_CACHE_CONFIG, **app_config, **(config or {})}
+    cache.init_app(app, config=config)
+    tag_cache = create_tag_cache(config)
+
+
+def create_tag_cache(config: Dict) -> BaseCache | None:
+    # never evicted and shared like the responses
+    cache_type = config["CACHE_TYPE"]
+    if cache_type == TIERED_CACHE_TYPE:
+        cache_type = config.get("CACHE_SHARED_TIER", SHARED_TIER_FILESYSTEM)
+
+    if cache_type == SHARED_TIER_GLOBAL_DATA_STORE:
+        from python_utils.flask.shared import shared_dict
+        return GlobalDataStoreCache(threshold=0, default_timeout=0, entries=shared_dict(name="cache.response_tags"))
+    if cache_type in [SHARED_TIER_FILESYSTEM, "FileSystemCache"]:
+        tag_directory = config.get("CACHE_TAG_DIR") or f"{os.path.normpath(config['CACHE_DIR'])}-tags"
+        return FileSystemCache(tag_directory, threshold=0, default_timeout=0)
+    if cache_type in ["simple", "SimpleCache"]:
+        return SimpleCache(threshold=sys.maxsize, default_timeout=0)
+    # e.g. Redis, which does not evict entries without timeout by default
+    return None
+
+
+def get_tag_cache() -> BaseCache:
+    return tag_cache or cache
+
+
+def get_cache_statistics() -> Dict | None:
+    if not hasattr(cache.cache, "get_statistics"):
+        return None
+    return cache.cache.get_statistics()
+
+
+def is_cache_initialized() -> bool:
+    return cache in current_app.extensions.get("cache", {})
+
+
+class KeyLocks:
+    # One lock per key, removed when no request holds or waits for it
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.locks: Dict[str, List] = {}
+
+    def acquire(self, key: str):
+        with self.lock:
+            entry = self.locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+
+    def release(self, key: str):
+        with self.lock:
+            entry = self.locks[key]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self.locks[key]
+
+
+key_locks = KeyLocks()
+
+
+def cached_response(ttl: int = 300, tags: List[str] = None, scope: Callable[[], str] = None,
+                    unless: Callable[[], bool] = None):
+    # Caches the response of a route by path, args, JSON body, auth scope and content encoding.
+    # The endpoint name and the tags can be passed to invalidate_responses. Use it below token_required.
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if not is_cache_initialized() or (unless and unless()):
+                return fn(*args, **kwargs)
+
+            key = create_response_key([request.endpoint, *(tags or [])], (scope or get_auth_scope)())
+            return get_cached_response(key, ttl, lambda: make_response(fn(*args, **kwargs)))
+
+        return decorator
+
+    return wrapper
+
+
+def invalidates_responses(*tags: str):
+    # Invalidates the cached responses of the tags after the route was successful
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code < 400:
+                invalidate_responses(*tags)
+            return response
+
+        return decorator
+
+    return wrapper
+
+
+def invalidate_responses(*tags: str):
+    # A new generation of the tag changes the keys of all its responses. The old ones expire.
+    if not is_cache_initialized():
+        return
+    for tag in tags:
+        get_tag_cache().set(get_tag_key(tag), time.time_ns(), timeout=0)
+
+
+def get_tag_key(tag: str) -> str:
+    return f"response-tag|{tag}"
+
+
+def get_auth_scope() -> str:
+    # the auth id of jira_security, or nothing for public routes
+    auth_id = request.headers.get("Authorization") or request.cookies.get("auth_id") or ""
+    return hashlib.sha1(auth_id.encode("utf-8")).hexdigest()
+
+
+def get_body_hash() -> str:
+    body = request.get_json(silent=True)
+    if body is not None:
+        data = json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    else:
+        data = request.get_data()
+    return hashlib.sha1(data).hexdigest() if data else ""
+
+
+def create_response_key(tags: List[str], scope: str) -> str:
+    generations = get_tag_cache().get_many(*[get_tag_key(tag) for tag in tags])
+    parts = [request.method, request.path, sorted(request.args.items(multi=True)), get_body_hash(), scope,
+             negotiate_encoding(), list(zip(tags, generations))]
+    return f"response|{hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()}"
+
+
+def get_cached_response(key: str, ttl: int, create_response: Callable[[], Response]) -> Response:
+    entry = cache.get(key)
+    if entry and entry["expires"] > time.time():
+        return to_response(entry)
+
+    if entry:
+        # the first request recomputes the expired response, all others send it until then. The add is atomic between
+        # the workers with the global_data_store tier, with a FileSystemCache a few workers may recompute at once.
+        lock_key = f"{key}|lock"
+        if not cache.add(lock_key, True, timeout=RECOMPUTE_LOCK_TIMEOUT):
+            return to_response(entry)
+        try:
+            return store_response(key, ttl, create_response())
+        finally:
+            cache.delete(lock_key)
+
+    # without a response to send, concurrent requests in this process wait for the first one
+    key_locks.acquire(key)
+    try:
+        entry = cache.get(key)
+        if entry:
+            return to_response(entry)
+        return store_response(key, ttl, create_response())
+    finally:
+        key_locks.release(key)
+
+
+def store_response(key: str, ttl: int, response: Response) -> Response:
+    if response.status_code != 200 or response.is_streamed or "Set-Cookie" in response.headers:
+        return response
+
+    cache.set(key, {
+        "body": response.get_data(),
+        "headers": list(response.headers.items()),
+        "expires": time.time() + ttl
+    }, timeout=ttl + STALE_TIME_TO_LIVE)
 
-cache = Cache(config={'CACHE_TYPE': "SimpleCache", 'CACHE_DEFAULT_TIMEOUT': 300})
+    return response
 
 
-def init_cache(app):
-    cache.init_app(app)
\ No newline at end of file
+def to_response(entry: Dict) -> Response:
+    response = Response(entry["body"], status=200, headers=entry["headers"])
+    return response.make_conditional(request)
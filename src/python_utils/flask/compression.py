@@ -0,0 +1,252 @@
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import Response, request, has_request_context
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Smaller bodies are sent uncompressed
+MIN_COMPRESSION_SIZE = 1024
+
+
+class GzipCompressor:
+    name = "gzip"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = self.create_stream()
+        return compressor.compress(data) + compressor.finish()
+
+    def create_stream(self):
+        return GzipStream(zlib.compressobj(self.level, zlib.DEFLATED, 31))
+
+
+class GzipStream:
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        # every chunk is flushed, so the client can process it immediately
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    name = "br"
+
+    def __init__(self, quality: int = 4):
+        self.quality = quality
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def create_stream(self):
+        return BrotliStream(brotli.Compressor(quality=self.quality))
+
+
+class BrotliStream:
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def create_stream(self):
+        return ZstdStream(zstandard.ZstdCompressor(level=self.level).compressobj())
+
+
+class ZstdStream:
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# in order of preference for equal quality values of the client
+compressors: Dict[str, object] = {}
+if zstandard:
+    compressors[ZstdCompressor.name] = ZstdCompressor()
+if brotli:
+    compressors[BrotliCompressor.name] = BrotliCompressor()
+compressors[GzipCompressor.name] = GzipCompressor()
+
+
+class CompressedBodyCache:
+    # Compressed bodies of responses built from cached data, by cache key and encoding. Least recently used first.
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.bodies: OrderedDict[Tuple, Tuple[Optional[str], bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Tuple[Optional[str], bytes]]:
+        with self.lock:
+            entry = self.bodies.get(key)
+            if entry is not None:
+                self.bodies.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, encoding: Optional[str], body: bytes):
+        if len(body) > self.max_size:
+            return
+
+        with self.lock:
+            previous_entry = self.bodies.pop(key, None)
+            if previous_entry:
+                self.size -= len(previous_entry[1])
+            self.bodies[key] = (encoding, body)
+            self.size += len(body)
+            while self.size > self.max_size:
+                _, (_, evicted_body) = self.bodies.popitem(last=False)
+                self.size -= len(evicted_body)
+
+    def clear(self):
+        with self.lock:
+            self.bodies = OrderedDict()
+            self.size = 0
+
+
+compressed_body_cache = CompressedBodyCache()
+
+
+def negotiate_encoding() -> Optional[str]:
+    if not has_request_context():
+        return None
+
+    encoding = request.accept_encodings.best_match(list(compressors))
+    return encoding if encoding in compressors else None
+
+
+def compress_body(create_body: Callable[[], bytes], cache_key: str = None) -> Tuple[Optional[str], bytes]:
+    # cache_key: identifies the body, e.g. by the timestamp of the cached data. The body is created and
+    # compressed only once per encoding.
+    encoding = negotiate_encoding()
+    memo_key = (cache_key, encoding)
+    if cache_key:
+        entry = compressed_body_cache.get(memo_key)
+        if entry is not None:
+            return entry
+
+    body = create_body()
+    used_encoding = None
+    if encoding and len(body) >= MIN_COMPRESSION_SIZE:
+        body = compressors[encoding].compress(body)
+        used_encoding = encoding
+
+    if cache_key:
+        compressed_body_cache.put(memo_key, used_encoding, body)
+
+    return used_encoding, body
+
+
+def set_compressed_body(response: Response, create_body: Callable[[], bytes], cache_key: str = None) -> Response:
+    encoding, body = compress_body(create_body, cache_key)
+    response.set_data(body)
+    set_encoding_headers(response, encoding)
+    return response
+
+
+def compress_response(response: Response, cache_key: str = None) -> Response:
+    if response.is_streamed:
+        return compress_stream_response(response, cache_key)
+    return set_compressed_body(response, response.get_data, cache_key)
+
+
+def compress_stream_response(response: Response, cache_key: str = None) -> Response:
+    # Chunks are compressed one by one. With a cache key the complete compressed stream is memoized
+    # and sent at once on the next request.
+    encoding = negotiate_encoding()
+    memo_key = (cache_key, encoding)
+    entry = compressed_body_cache.get(memo_key) if cache_key else None
+    if entry is not None:
+        used_encoding, body = entry
+        close_stream(response.response)
+        response.set_data(body)
+        set_encoding_headers(response, used_encoding)
+        return response
+
+    if not encoding and not cache_key:
+        set_encoding_headers(response, None)
+        return response
+
+    response.response = iterate_compressed_stream(response.response, encoding, memo_key if cache_key else None)
+    set_encoding_headers(response, encoding)
+    return response
+
+
+def iterate_compressed_stream(chunks: Iterable[bytes], encoding: Optional[str], memo_key: Tuple = None) -> Iterator[bytes]:
+    stream = compressors[encoding].create_stream() if encoding else None
+    memo_chunks: List[bytes] = [] if memo_key else None
+    memo_size = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if stream:
+                chunk = stream.compress(chunk)
+            if memo_chunks is not None:
+                memo_chunks.append(chunk)
+                memo_size += len(chunk)
+                if memo_size > compressed_body_cache.max_size:
+                    memo_chunks = None
+            if chunk:
+                yield chunk
+    finally:
+        close_stream(chunks)
+
+    if stream:
+        chunk = stream.finish()
+        if memo_chunks is not None:
+            memo_chunks.append(chunk)
+        yield chunk
+
+    # only complete streams are memoized
+    if memo_chunks is not None:
+        compressed_body_cache.put(memo_key, encoding, b"".join(memo_chunks))
+
+
+def close_stream(chunks: Iterable):
+    # a stream_with_context generator leaves the request context only when it is closed
+    if hasattr(chunks, "close"):
+        chunks.close()
+
+
+def set_encoding_headers(response: Response, encoding: Optional[str]):
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
@@ -0,0 +1,65 @@
+import codecs
+import csv
+import io
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from python_utils.flask.json_encoder import encode_json
+
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+class CsvColumn:
+    # path: dotted path into the item, e.g. "fields.status.name". extract: computes the value from the item instead.
+
+    def __init__(self, title: str, path: str = None, extract: Callable[[Dict], Any] = None):
+        self.title = title
+        self.path = (path or title).split(".")
+        self.extract = extract
+
+    def get_value(self, item: Dict) -> str:
+        if self.extract:
+            return format_csv_value(self.extract(item))
+
+        value = item
+        for key in self.path:
+            if not isinstance(value, dict) or key not in value:
+                return ""
+            value = value[key]
+        return format_csv_value(value)
+
+
+def create_columns(column_specs: Dict[str, str | Callable[[Dict], Any]] | List[str]) -> List[CsvColumn]:
+    # a list of paths, or titles with a path or a function each
+    if isinstance(column_specs, list):
+        return [CsvColumn(path) for path in column_specs]
+
+    return [CsvColumn(title, extract=spec) if callable(spec) else CsvColumn(title, path=spec)
+            for title, spec in column_specs.items()]
+
+
+def format_csv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return encode_json(value).decode("utf-8")
+    return str(value)
+
+
+def iterate_csv_stream(items: Iterable[Dict], columns: List[CsvColumn], encoding: str = "utf-16", delimiter: str = ";",
+                       chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[bytes]:
+    # The rows are encoded incrementally, so a BOM of UTF-16 is written once at the beginning.
+    encoder = codecs.getincrementalencoder(encoding)()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\r\n")
+
+    writer.writerow([column.title for column in columns])
+    for item in items:
+        writer.writerow([column.get_value(item) for column in columns])
+        if buffer.tell() >= chunk_size:
+            yield encoder.encode(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield encoder.encode(buffer.getvalue(), final=True)
@@ -1,10 +1,16 @@
 import atexit
+import hashlib
 import logging
-from flask import Flask, Response, Blueprint, send_from_directory, request
-from typing import Dict, Tuple
+from flask import Flask, Response, Blueprint, send_from_directory, request, has_request_context, stream_with_context
+from typing import Dict, List, Tuple, Iterable, Iterator
 from python_utils.file import lookup_directory
+from python_utils.flask.json_encoder import encode_json
+from python_utils.flask.compression import set_compressed_body, compress_response, set_encoding_headers
+from python_utils.flask.csv_stream import CsvColumn, iterate_csv_stream
+from python_utils.timestamp import as_epoch_millis
 import datetime
-import json
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 init_service_functions = []
 registered_endpoints = []
@@ -90,10 +96,64 @@ def destroy_endpoint(destroy_function):
     destroy_endpoint_functions.append(destroy_function)
 
 
-def response_json(some_object) -> Response:
-    response = Response(object_to_json(some_object), mimetype='application/json')
+def response_json(some_object, pretty: bool = None, cache_key: str = None, version: str = None,
+                  last_modified: str | datetime.datetime = None) -> Response:
+    # cache_key: identifies the data, e.g. by the timestamp of a cache. The body is encoded and compressed only once.
+    # version: answered with 304 Not Modified (412 for POST), if the client has this version already. Nothing is encoded then.
+    not_modified_response = response_not_modified(version, last_modified)
+    if not_modified_response:
+        return not_modified_response
+
+    if pretty is None:
+        pretty = is_pretty_requested()
+    response = Response(mimetype='application/json')
     response.headers["Content-Type"] = "application/json; charset=utf-8"
-    return response
+    set_version_headers(response, version, last_modified)
+    return set_compressed_body(response, lambda: object_to_json(some_object, pretty),
+                               f"{cache_key}|pretty={pretty}" if cache_key else None)
+
+
+def response_json_stream(items: Iterable, wrapper: Dict = None, items_key: str = "items", cache_key: str = None,
+                         version: str = None, last_modified: str | datetime.datetime = None) -> Response:
+    # Encodes the items one by one into a chunked response. The items are never held in memory at once.
+    not_modified_response = response_not_modified(version, last_modified)
+    if not_modified_response:
+        return not_modified_response
+
+    response = Response(stream_with_context(iterate_json_stream(items, wrapper, items_key)), mimetype='application/json')
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    set_version_headers(response, version, last_modified)
+    return compress_response(response, cache_key)
+
+
+def iterate_json_stream(items: Iterable, wrapper: Dict = None, items_key: str = "items",
+                        chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    # Without wrapper: [item, ...], with wrapper: {...wrapper, items_key: [item, ...]}
+    if wrapper is None:
+        prefix, suffix = b"[", b"]"
+    else:
+        head = {key: value for key, value in wrapper.items() if key != items_key}
+        prefix = encode_json(head)[:-1] + (b"," if head else b"") + encode_json(items_key) + b":["
+        suffix = b"]}"
+
+    # the beginning is sent at once, the items are collected into chunks of about chunk_size
+    yield prefix
+    chunk = []
+    chunk_length = 0
+    separator = b""
+    for item in items:
+        data = encode_json(item)
+        chunk.append(separator)
+        chunk.append(data)
+        chunk_length += len(data) + 1
+        separator = b","
+        if chunk_length >= chunk_size:
+            yield b"".join(chunk)
+            chunk = []
+            chunk_length = 0
+
+    chunk.append(suffix)
+    yield b"".join(chunk)
 
 
 def response_text(text: str) -> Response:
@@ -103,7 +163,7 @@ def response_text(text: str) -> Response:
 
 
 def response_cookie(cookie_name: str, cookie_value: str, object: dict):
-    json = object_to_json(object)
+    json = object_to_json(object, None)
     response = Response(json, mimetype='application/json')
     response.headers["Content-Type"] = "application/json; charset=utf-8"
     response.set_cookie(key=cookie_name, value=cookie_value, expires=get_expire_date(90))
@@ -113,8 +173,15 @@ def get_expire_date(days: int) -> datetime:
     return datetime.datetime.now() + datetime.timedelta(days=days)
 
 
-def object_to_json(some_object: Dict) -> bytes:
-    return json.dumps(some_object, ensure_ascii=False, indent=2, sort_keys=True).encode(encoding='utf-8')
+def object_to_json(some_object: Dict, pretty: bool = False) -> bytes:
+    # compact by default, pretty: indented and sorted. None: pretty if requested by ?pretty=1
+    if pretty is None:
+        pretty = is_pretty_requested()
+    return encode_json(some_object, pretty)
+
+
+def is_pretty_requested() -> bool:
+    return has_request_context() and request.args.get("pretty", "").lower() in ["1", "true"]
 
 
 def response_error(error_code, text) -> Tuple[Response, int]:
@@ -131,12 +198,78 @@ def response_html(html):
     return response
 
 
-def response_csv(csv):
+def response_csv(csv, cache_key: str = None, version: str = None, last_modified: str | datetime.datetime = None):
+    not_modified_response = response_not_modified(version, last_modified)
+    if not_modified_response:
+        return not_modified_response
+
     response = Response(csv, mimetype='text/csv', content_type='"text/csv; charset=utf-16"')
     response.headers["Access-Control-Allow-Origin"] = "http://localhost:4210"
+    set_version_headers(response, version, last_modified)
+    return compress_response(response, cache_key)
+
+
+def response_csv_stream(items: Iterable[Dict], columns: List[CsvColumn], encoding: str = "utf-16", delimiter: str = ";",
+                        filename: str = None, cache_key: str = None, version: str = None,
+                        last_modified: str | datetime.datetime = None) -> Response:
+    # Writes one row per item into a chunked response. The items are never held in memory at once.
+    not_modified_response = response_not_modified(version, last_modified)
+    if not_modified_response:
+        return not_modified_response
+
+    response = Response(stream_with_context(iterate_csv_stream(items, columns, encoding, delimiter)), mimetype='text/csv')
+    response.headers["Content-Type"] = f"text/csv; charset={encoding}"
+    response.headers["Access-Control-Allow-Origin"] = "http://localhost:4210"
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    set_version_headers(response, version, last_modified)
+    return compress_response(response, cache_key)
+
+
+def create_etag(version: str) -> str:
+    return hashlib.sha1(version.encode("utf-8")).hexdigest()
+
+
+def to_last_modified(timestamp: str | datetime.datetime) -> datetime.datetime | None:
+    try:
+        epoch_millis = as_epoch_millis(timestamp) if timestamp else None
+    except ValueError:
+        epoch_millis = None
+    if epoch_millis is None:
+        return None
+    return datetime.datetime.fromtimestamp(epoch_millis // 1000, datetime.timezone.utc)
+
+
+def response_not_modified(version: str, last_modified: str | datetime.datetime = None) -> Response | None:
+    # Views can call this before the data is loaded. The ETag is weak, it is the same for every content encoding.
+    if not version or not has_request_context():
+        return None
+
+    # RFC 9110: a matching If-None-Match is a 304 only for GET/HEAD, other methods get a 412.
+    # If-Modified-Since is ignored for them.
+    safe_method = request.method in ("GET", "HEAD")
+    if request.if_none_match:
+        if not request.if_none_match.contains_weak(create_etag(version)):
+            return None
+    else:
+        modified = to_last_modified(last_modified)
+        if not safe_method or not modified or not request.if_modified_since or modified > request.if_modified_since:
+            return None
+
+    response = Response(status=304 if safe_method else 412)
+    set_version_headers(response, version, last_modified)
+    set_encoding_headers(response, None)
     return response
 
 
+def set_version_headers(response: Response, version: str, last_modified: str | datetime.datetime = None):
+    if version:
+        response.set_etag(create_etag(version), weak=True)
+    modified = to_last_modified(last_modified)
+    if modified:
+        response.last_modified = modified
+
+
 def response_jsonp(json_text: str):
     callback_function_name = request.args.get('callback', 'jsonp_callback')
     jsonp = f"{callback_function_name}({json_text});"
@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonEncoder:
+    name = "json"
+
+    def encode(self, some_object: Any, pretty=False) -> bytes:
+        if pretty:
+            return json.dumps(some_object, ensure_ascii=False, indent=2, sort_keys=True).encode(encoding='utf-8')
+        return json.dumps(some_object, ensure_ascii=False, separators=(",", ":")).encode(encoding='utf-8')
+
+
+class OrjsonEncoder(JsonEncoder):
+    # orjson is several times faster and always writes compact UTF-8.
+    # Objects orjson does not support (e.g. integers beyond 64 bit) are encoded by the json module.
+    name = "orjson"
+
+    def encode(self, some_object: Any, pretty=False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(some_object, option=option)
+        except TypeError:
+            return super().encode(some_object, pretty)
+
+
+json_encoders: Dict[str, JsonEncoder] = {JsonEncoder.name: JsonEncoder()}
+if orjson:
+    json_encoders[OrjsonEncoder.name] = OrjsonEncoder()
+
+json_encoder: JsonEncoder = json_encoders.get(OrjsonEncoder.name, json_encoders[JsonEncoder.name])
+
+
+def register_json_encoder(encoder: JsonEncoder):
+    json_encoders[encoder.name] = encoder
+
+
+def set_json_encoder(name: str):
+    global json_encoder
+    if name not in json_encoders:
+        raise Exception(f"Unknown json encoder: {name}. Available: {list(json_encoders)}")
+    json_encoder = json_encoders[name]
+
+
+def get_json_encoder() -> JsonEncoder:
+    return json_encoder
+
+
+def encode_json(some_object: Any, pretty=False) -> bytes:
+    return json_encoder.encode(some_object, pretty)
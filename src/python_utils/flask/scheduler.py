@@ -6,7 +6,7 @@ import schedule
 from python_utils.flask.shared import shared_dict
 
 logger = logging.getLogger(__name__)
-scheduler_running = shared_dict()
+scheduler_running = shared_dict(near_cache=True)
 
 
 def __schedule_task():
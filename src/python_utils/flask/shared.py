@@ -1,8 +1,28 @@
+from __future__ import annotations
+
+import struct
+import threading
+import time
 import traceback
+import uuid
+import zlib
+from collections import deque, OrderedDict
 from collections.abc import MutableMapping, MutableSequence
-from multiprocessing.managers import SyncManager
-from typing import Dict, Any, List
+from multiprocessing.managers import SyncManager, BaseProxy
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Any, List, Tuple, Callable
 import inspect
+import logging
+import os
+import tempfile
+from python_utils.flask.shared_socket import UnixSocketDataClient, UnixSocketDataServerProcess, create_private_directory
+from python_utils.flask.shared_memory_store import SharedMemoryDict, open_shared_memory, unlink_shared_memory, release_shared_memory_dicts, \
+    RUN_ID_VARIABLE
+from python_utils.flask.shared_persistence import NamespacePersistence
+from python_utils.flask.shared_metrics import SharedMetrics, measured
+from python_utils.profiler import ProfilerProvider, profiler
+
+logger = logging.getLogger(__name__)
 
 
 class FlaskShareSyncManager(SyncManager):
@@ -16,111 +36,936 @@ def get_shared_data():
     return shared_data
 
 
+class NamespaceVersions:
+    # Version counters in shared memory. Workers check them without any IPC.
+    # Namespaces are hashed to slots; a collision only causes an additional cache refresh.
+    # The last slot marks versions released by a stopped server.
+    SLOTS = 4096
+    SLOT_FORMAT = "Q"
+    SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+
+    def __init__(self, shared_memory: SharedMemory):
+        self.shared_memory = shared_memory
+
+    @staticmethod
+    def create() -> NamespaceVersions:
+        return NamespaceVersions(open_shared_memory(create=True, size=(NamespaceVersions.SLOTS + 1) * NamespaceVersions.SLOT_SIZE))
+
+    @staticmethod
+    def attach(name: str) -> NamespaceVersions:
+        return NamespaceVersions(open_shared_memory(name=name))
+
+    def get_name(self) -> str:
+        return self.shared_memory.name
+
+    def get_offset(self, namespace: str) -> int:
+        return (zlib.crc32(namespace.encode("utf-8")) % self.SLOTS) * self.SLOT_SIZE
+
+    def get_version(self, namespace: str) -> int:
+        return struct.unpack_from(self.SLOT_FORMAT, self.shared_memory.buf, self.get_offset(namespace))[0]
+
+    def increment(self, namespace: str):
+        offset = self.get_offset(namespace)
+        version = struct.unpack_from(self.SLOT_FORMAT, self.shared_memory.buf, offset)[0]
+        struct.pack_into(self.SLOT_FORMAT, self.shared_memory.buf, offset, (version + 1) % 2 ** 64)
+
+    def is_released(self) -> bool:
+        return struct.unpack_from(self.SLOT_FORMAT, self.shared_memory.buf, self.SLOTS * self.SLOT_SIZE)[0] == 1
+
+    def close(self):
+        self.shared_memory.close()
+
+    def unlink(self):
+        struct.pack_into(self.SLOT_FORMAT, self.shared_memory.buf, self.SLOTS * self.SLOT_SIZE, 1)
+        unlink_shared_memory(self.shared_memory)
+
+
+class NamespacePolicy:
+
+    def __init__(self, ttl: float = None, max_size: int = None, sliding=True, persistent=False):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sliding = sliding
+        self.persistent = persistent
+
+    def __repr__(self) -> str:
+        return f"NamespacePolicy(ttl={self.ttl}, max_size={self.max_size}, sliding={self.sliding}, persistent={self.persistent})"
+
+
+class SharedNamespaces:
+    # Lives in the manager process. Every operation works on a single key of a namespace,
+    # so only this key and its value are transferred between the worker and the manager.
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, namespaces: Dict[str, Any]):
+        self.namespaces = namespaces
+        self.lock = threading.RLock()
+        self.versions: NamespaceVersions = None
+        self.fallback_versions: Dict[str, int] = {}
+        self.policies: Dict[str, NamespacePolicy] = {}
+        self.expiry_times: Dict[str, Dict[Any, float]] = {}
+        self.sweeper: threading.Thread = None
+        self.persistence: NamespacePersistence = None
+        self.metrics = SharedMetrics()
+
+    def get_versions_name(self) -> str:
+        with self.lock:
+            if not self.versions:
+                self.versions = NamespaceVersions.create()
+            return self.versions.get_name()
+
+    def get_version(self, namespace: str) -> int:
+        with self.lock:
+            if self.versions:
+                return self.versions.get_version(namespace)
+            return self.fallback_versions.get(namespace, 0)
+
+    def increment_version(self, namespace: str):
+        if self.versions:
+            self.versions.increment(namespace)
+        else:
+            self.fallback_versions[namespace] = self.fallback_versions.get(namespace, 0) + 1
+
+    def release(self):
+        with self.lock:
+            if self.persistence:
+                self.persistence.stop(self.collect)
+                self.persistence = None
+            if self.versions:
+                self.versions.unlink()
+                self.versions = None
+
+    def configure_metrics(self, enabled=True, payload_sizes=False):
+        self.metrics.configure(enabled, payload_sizes)
+
+    def get_metrics(self) -> Dict:
+        return self.metrics.get_metrics()
+
+    def reset_metrics(self):
+        self.metrics.reset()
+
+    def enable_persistence(self, directory: str, interval: float = 5):
+        with self.lock:
+            if self.persistence:
+                return
+
+            self.persistence = NamespacePersistence(directory, interval)
+            self.persistence.restore()
+            for namespace, policy in self.policies.items():
+                if policy.persistent:
+                    self.restore_namespace(namespace)
+            self.persistence.start(self.collect)
+
+    def restore_namespace(self, namespace: str):
+        # only namespaces configured as persistent are restored, with the expiry times of their entries
+        restored_namespace = self.persistence.take_restored_namespace(namespace)
+        if restored_namespace and namespace not in self.namespaces:
+            data, expiry_times = restored_namespace
+            self.namespaces[namespace] = data
+            self.expiry_times[namespace] = expiry_times
+            self.increment_version(namespace)
+        self.persistence.add_namespace(namespace)
+
+    def is_persistent(self, namespace: str) -> bool:
+        with self.lock:
+            return bool(self.persistence) and self.persistence.is_persistent(namespace)
+
+    def collect(self, collect_function: Callable) -> Any:
+        with self.lock:
+            return collect_function(self.namespaces, self.expiry_times)
+
+    def mark_changed(self, namespace: str, keys: List = None):
+        if self.persistence:
+            self.persistence.mark_changed(namespace, keys)
+
+    def configure_namespace(self, namespace: str, ttl: float = None, max_size: int = None, sliding=True, persistent=False):
+        with self.lock:
+            if persistent and not self.persistence and not self.policies.get(namespace, NamespacePolicy()).persistent:
+                logger.warning(f"Namespace {namespace} is not persisted: the server was started without a persistence directory")
+            self.policies[namespace] = NamespacePolicy(ttl, max_size, sliding, persistent)
+            if persistent and self.persistence:
+                self.restore_namespace(namespace)
+            expiry_times = self.expiry_times.setdefault(namespace, {})
+            if ttl:
+                expiry_time = time.time() + ttl
+                for key in self.namespaces.get(namespace, {}):
+                    expiry_times.setdefault(key, expiry_time)
+                self.expire(namespace)
+                self.start_sweeper()
+            self.evict(namespace)
+
+    def start_sweeper(self):
+        if not self.sweeper:
+            self.sweeper = threading.Thread(target=self.run_sweeper, name="SharedNamespacesSweeper", daemon=True)
+            self.sweeper.start()
+
+    def run_sweeper(self):
+        while True:
+            time.sleep(self.SWEEP_INTERVAL)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error during sweep of shared namespaces: {e}")
+
+    def sweep(self) -> int:
+        removed_entries = 0
+        with self.lock:
+            for namespace in list(self.expiry_times):
+                removed_entries += self.expire(namespace)
+        return removed_entries
+
+    def expire(self, namespace: str) -> int:
+        policy = self.policies.get(namespace)
+        if not policy or not policy.ttl:
+            return 0
+
+        now = time.time()
+        expiry_times = self.expiry_times.get(namespace, {})
+        expired_keys = [key for key, expiry_time in expiry_times.items() if expiry_time <= now]
+        data = self.namespaces.get(namespace, {})
+        for key in expired_keys:
+            data.pop(key, None)
+            expiry_times.pop(key, None)
+        if expired_keys:
+            self.mark_changed(namespace, expired_keys)
+            self.increment_version(namespace)
+
+        return len(expired_keys)
+
+    def access(self, namespace: str, key: Any) -> Dict:
+        # Drops an expired entry, slides its expiry time and keeps the least recently used entries first
+        data = self.namespaces.get(namespace, {})
+        policy = self.policies.get(namespace)
+        if not policy or key not in data:
+            return data
+
+        expiry_times = self.expiry_times[namespace]
+        if policy.ttl and expiry_times.get(key, float("inf")) <= time.time():
+            del data[key]
+            expiry_times.pop(key, None)
+            self.mark_changed(namespace, [key])
+            self.increment_version(namespace)
+            return data
+
+        if policy.ttl and policy.sliding:
+            expiry_times[key] = time.time() + policy.ttl
+            if self.persistence:
+                self.persistence.mark_slid(namespace, key, expiry_times[key], policy.ttl)
+        if policy.max_size:
+            data[key] = data.pop(key)
+
+        return data
+
+    def written(self, namespace: str, keys: List):
+        self.mark_changed(namespace, keys)
+        policy = self.policies.get(namespace)
+        if not policy:
+            return
+
+        data = self.namespaces.get(namespace, {})
+        expiry_times = self.expiry_times[namespace]
+        for key in keys:
+            if policy.ttl:
+                expiry_times[key] = time.time() + policy.ttl
+            if policy.max_size and key in data:
+                data[key] = data.pop(key)
+        self.evict(namespace)
+
+    def evict(self, namespace: str):
+        policy = self.policies.get(namespace)
+        data = self.namespaces.get(namespace)
+        if policy and policy.max_size and isinstance(data, (list, deque)):
+            self.namespaces[namespace] = deque(data, maxlen=policy.max_size)
+            if len(data) > policy.max_size:
+                self.increment_version(namespace)
+            return
+        if not policy or not policy.max_size or not isinstance(data, dict) or len(data) <= policy.max_size:
+            return
+
+        # like expire, near caches must not return the evicted entries
+        expiry_times = self.expiry_times.get(namespace, {})
+        while len(data) > policy.max_size:
+            key = next(iter(data))
+            del data[key]
+            expiry_times.pop(key, None)
+            self.mark_changed(namespace, [key])
+        self.increment_version(namespace)
+
+    def forget(self, namespace: str, key: Any):
+        self.expiry_times.get(namespace, {}).pop(key, None)
+
+    def get_namespace(self, namespace: str) -> Dict:
+        with self.lock:
+            data = self.namespaces.get(namespace)
+            if data is None:
+                data = {}
+                self.namespaces[namespace] = data
+            return data
+
+    @measured
+    def get_item(self, namespace: str, key: Any, default: Any = None) -> Any:
+        with self.lock:
+            return self.access(namespace, key).get(key, default)
+
+    @measured
+    def lookup_item(self, namespace: str, key: Any) -> Tuple[bool, Any]:
+        with self.lock:
+            data = self.access(namespace, key)
+            return key in data, data.get(key)
+
+    @measured
+    def touch(self, namespace: str, key: Any) -> bool:
+        with self.lock:
+            return key in self.access(namespace, key)
+
+    @measured
+    def set_item(self, namespace: str, key: Any, value: Any):
+        with self.lock:
+            self.get_namespace(namespace)[key] = value
+            self.written(namespace, [key])
+            self.increment_version(namespace)
+
+    @measured
+    def delete_item(self, namespace: str, key: Any) -> bool:
+        with self.lock:
+            data = self.namespaces.get(namespace, {})
+            if key not in data:
+                return False
+            del data[key]
+            self.forget(namespace, key)
+            self.mark_changed(namespace, [key])
+            self.increment_version(namespace)
+            return True
+
+    @measured
+    def contains_item(self, namespace: str, key: Any) -> bool:
+        with self.lock:
+            return key in self.access(namespace, key)
+
+    @measured
+    def get_keys(self, namespace: str) -> List:
+        with self.lock:
+            self.expire(namespace)
+            return list(self.namespaces.get(namespace, {}))
+
+    @measured
+    def get_length(self, namespace: str) -> int:
+        with self.lock:
+            self.expire(namespace)
+            return len(self.namespaces.get(namespace, {}))
+
+    @measured
+    def get_data(self, namespace: str, default: Any = None) -> Any:
+        with self.lock:
+            self.expire(namespace)
+            data = self.namespaces.get(namespace)
+            return default if data is None else data
+
+    @measured
+    def set_data(self, namespace: str, data: Any):
+        with self.lock:
+            self.namespaces[namespace] = data
+            self.mark_changed(namespace)
+            if namespace in self.expiry_times:
+                self.expiry_times[namespace] = {}
+                self.written(namespace, list(data) if isinstance(data, dict) else [])
+            self.increment_version(namespace)
+
+    @measured
+    def delete_namespace(self, namespace: str):
+        with self.lock:
+            self.namespaces.pop(namespace, None)
+            self.mark_changed(namespace)
+            if namespace in self.expiry_times:
+                self.expiry_times[namespace] = {}
+            self.increment_version(namespace)
+
+    @measured
+    def update_many(self, namespace: str, items: Dict):
+        with self.lock:
+            self.get_namespace(namespace).update(items)
+            self.written(namespace, list(items))
+            self.increment_version(namespace)
+
+    @measured
+    def get_many(self, namespace: str, keys: List) -> Dict:
+        with self.lock:
+            result = {}
+            for key in keys:
+                data = self.access(namespace, key)
+                if key in data:
+                    result[key] = data[key]
+            return result
+
+    @measured
+    def increment(self, namespace: str, key: Any, amount: int | float = 1, initial_value: int | float = 0) -> int | float:
+        with self.lock:
+            self.access(namespace, key)
+            data = self.get_namespace(namespace)
+            data[key] = data.get(key, initial_value) + amount
+            self.written(namespace, [key])
+            self.increment_version(namespace)
+            return data[key]
+
+    @measured
+    def setdefault(self, namespace: str, key: Any, default: Any = None) -> Any:
+        with self.lock:
+            self.access(namespace, key)
+            data = self.get_namespace(namespace)
+            if key not in data:
+                data[key] = default
+                self.written(namespace, [key])
+                self.increment_version(namespace)
+            return data[key]
+
+    @measured
+    def compare_and_swap(self, namespace: str, key: Any, expected_value: Any, new_value: Any) -> bool:
+        # A missing key matches an expected value of None
+        with self.lock:
+            self.access(namespace, key)
+            data = self.get_namespace(namespace)
+            if data.get(key) != expected_value:
+                return False
+            data[key] = new_value
+            self.written(namespace, [key])
+            self.increment_version(namespace)
+            return True
+
+    def get_list(self, namespace: str) -> List | deque:
+        # A list namespace with a max size is a ring buffer. The oldest entries are dropped on append.
+        data = self.namespaces.get(namespace)
+        if isinstance(data, deque):
+            return data
+
+        policy = self.policies.get(namespace)
+        if policy and policy.max_size:
+            data = deque(data or [], maxlen=policy.max_size)
+        elif data is None:
+            data = []
+        self.namespaces[namespace] = data
+        return data
+
+    @measured
+    def list_get(self, namespace: str, index: int | slice) -> Any:
+        with self.lock:
+            data = self.get_list(namespace)
+            if isinstance(index, slice) and isinstance(data, deque):
+                return list(data)[index]
+            return data[index]
+
+    @measured
+    def list_set(self, namespace: str, index: int | slice, value: Any):
+        with self.lock:
+            data = self.get_list(namespace)
+            if isinstance(index, slice) and isinstance(data, deque):
+                values = list(data)
+                values[index] = value
+                data.clear()
+                data.extend(values)
+            else:
+                data[index] = value
+            self.increment_version(namespace)
+
+    @measured
+    def list_delete(self, namespace: str, index: int | slice):
+        with self.lock:
+            data = self.get_list(namespace)
+            if isinstance(index, slice) and isinstance(data, deque):
+                values = list(data)
+                del values[index]
+                data.clear()
+                data.extend(values)
+            else:
+                del data[index]
+            self.increment_version(namespace)
+
+    @measured
+    def list_insert(self, namespace: str, index: int, value: Any):
+        with self.lock:
+            data = self.get_list(namespace)
+            if isinstance(data, deque) and len(data) == data.maxlen:
+                # a full deque cannot insert. Inserted at the index of the full list, then the oldest entry is dropped.
+                items = list(data)
+                items.insert(index, value)
+                self.namespaces[namespace] = deque(items[1:], maxlen=data.maxlen)
+            else:
+                data.insert(index, value)
+            self.increment_version(namespace)
+
+    @measured
+    def list_append(self, namespace: str, value: Any) -> int:
+        with self.lock:
+            data = self.get_list(namespace)
+            data.append(value)
+            self.increment_version(namespace)
+            return len(data)
+
+    @measured
+    def list_extend(self, namespace: str, values: List) -> int:
+        with self.lock:
+            data = self.get_list(namespace)
+            data.extend(values)
+            self.increment_version(namespace)
+            return len(data)
+
+    @measured
+    def list_pop(self, namespace: str, index: int = -1) -> Any:
+        with self.lock:
+            data = self.get_list(namespace)
+            if isinstance(data, deque) and index == 0:
+                value = data.popleft()
+            elif isinstance(data, deque) and index != -1:
+                value = data[index]
+                del data[index]
+            else:
+                value = data.pop(index)
+            self.increment_version(namespace)
+            return value
+
+    @measured
+    def list_contains(self, namespace: str, value: Any) -> bool:
+        with self.lock:
+            return value in self.namespaces.get(namespace, [])
+
+
+shared_namespaces = SharedNamespaces(shared_data)
+
+
+def get_shared_namespaces():
+    return shared_namespaces
+
+
+TRANSPORT_MANAGER = "manager"
+TRANSPORT_UNIX_SOCKET = "unix"
+
+CONNECTION_ERRORS = (OSError, EOFError)
+# repeated after a lost connection, the result is the same as of a single call
+IDEMPOTENT_METHODS = {"get_item", "lookup_item", "contains_item", "get_keys", "get_length", "get_data", "get_many",
+                      "get_version", "get_versions_name", "list_get", "list_contains", "is_persistent", "get_metrics",
+                      "touch", "set_item", "set_data", "update_many", "delete_namespace", "configure_namespace",
+                      "configure_metrics"}
+
+
 class GlobalDataStore:
 
-    def __init__(self, port: int = 12000):
+    def __init__(self, port: int = 12000, transport: str = TRANSPORT_MANAGER, socket_path: str = None):
         FlaskShareSyncManager.register("shared_data", get_shared_data)
-        self.manager = FlaskShareSyncManager(("127.0.0.1", port), authkey='password'.encode('utf-8'))
-        self.shared_data = None
+        FlaskShareSyncManager.register("shared_namespaces", get_shared_namespaces)
+        # the same secret is required by all workers
+        self.authkey = os.getenv("GLOBAL_DATA_AUTHKEY", "password").encode('utf-8')
+        self.manager = FlaskShareSyncManager(("127.0.0.1", port), authkey=self.authkey)
+        self.port = port
+        self.socket_server: UnixSocketDataServerProcess = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connected = False
+        self.generation = 0
+        self.metrics = SharedMetrics()
+        self.versions: NamespaceVersions = None
+        self.namespace_policies: Dict[str, NamespacePolicy] = {}
+        self.persistence_directory: str = None
+        self.persistence_interval: float = 5
+        self.set_transport(transport, socket_path)
+
+    def set_transport(self, transport: str, socket_path: str = None):
+        if transport not in [TRANSPORT_MANAGER, TRANSPORT_UNIX_SOCKET]:
+            raise Exception(f"Unknown transport: {transport}")
+
+        self.transport = transport
+        # by default the socket is created in a directory, which only the current user can access
+        self.socket_directory = None if socket_path else os.path.join(tempfile.gettempdir(), f"python_utils_global_data_{self.port}")
+        self.socket_path = socket_path or os.path.join(self.socket_directory, "global_data.sock")
+
+    def set_persistence(self, directory: str, interval: float = 5):
+        # Persistent namespaces are restored from this directory when the server starts
+        self.persistence_directory = directory
+        self.persistence_interval = interval
 
     def start(self):
-        self.manager.start()
+        if self.transport == TRANSPORT_UNIX_SOCKET:
+            if self.socket_directory:
+                create_private_directory(self.socket_directory)
+            self.socket_server = UnixSocketDataServerProcess(self.socket_path, get_shared_namespaces, self.authkey)
+            self.socket_server.start()
+            server_namespaces = UnixSocketDataClient(self.socket_path, self.authkey)
+        else:
+            self.manager.start()
+            server_namespaces = self.manager.shared_namespaces()
+
+        if self.persistence_directory:
+            server_namespaces.enable_persistence(self.persistence_directory, self.persistence_interval)
 
     def connect(self):
-        self.manager.connect()
-        self.shared_data = self.manager.shared_data()
+        self.local.shared_namespaces = None
+        self.connected = True
+        with self.lock:
+            self.attach_server()
+
+    @property
+    def shared_namespaces(self):
+        # Every thread uses its own connection. Threaded workers do not share the state of a proxy.
+        shared_namespaces = getattr(self.local, "shared_namespaces", None)
+        if shared_namespaces is None:
+            shared_namespaces = self.create_connection()
+            self.local.shared_namespaces = shared_namespaces
+        return shared_namespaces
+
+    def create_connection(self):
+        if self.transport == TRANSPORT_UNIX_SOCKET:
+            return UnixSocketDataClient(self.socket_path, self.authkey)
+
+        manager = FlaskShareSyncManager(self.manager.address, authkey=self.authkey)
+        manager.connect()
+        return manager.shared_namespaces()
+
+    def reconnect(self):
+        self.local.shared_namespaces = None
+        if self.transport == TRANSPORT_MANAGER:
+            # All proxies of a process share one connection per thread and address. The broken one must not be reused.
+            BaseProxy._address_to_local.pop(self.manager.address, None)
+        with self.lock:
+            self.attach_server()
+
+    def attach_server(self):
+        # A restarted server has new versions and does not know the policies yet
+        self.generation += 1
+        try:
+            versions_name = self.shared_namespaces.get_versions_name()
+            if not self.versions or self.versions.get_name() != versions_name:
+                # the previous versions are not closed, other threads may still read them
+                self.versions = NamespaceVersions.attach(versions_name)
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            logger.warning(f"Shared memory versions not available. Versions are checked by IPC: {e}")
+            self.versions = None
+        for name, policy in self.namespace_policies.items():
+            self.configure_namespace(name, policy)
+
+    def call(self, method_name: str, *arguments) -> Any:
+        if not self.metrics.enabled:
+            return self.execute(method_name, arguments)
+
+        namespace = arguments[0] if arguments else ""
+        start_time = time.perf_counter()
+        error = True
+        result = None
+        try:
+            if ProfilerProvider.is_profiling():
+                with profiler(f"GlobalDataStore.{method_name}({namespace})", threshold=0.005):
+                    result = self.execute(method_name, arguments)
+            else:
+                result = self.execute(method_name, arguments)
+            error = False
+            return result
+        finally:
+            self.metrics.record(namespace, method_name, time.perf_counter() - start_time, error, arguments, result)
+
+    def execute(self, method_name: str, arguments: Tuple) -> Any:
+        # A call may have been executed by the server, before the connection was lost. Only idempotent calls are
+        # repeated on a new connection, all others raise the error after the reconnect.
+        try:
+            return getattr(self.shared_namespaces, method_name)(*arguments)
+        except CONNECTION_ERRORS as e:
+            self.reconnect()
+            if method_name not in IDEMPOTENT_METHODS:
+                logger.warning(f"Reconnected to GlobalDataStore after: {e}. {method_name} is not repeated")
+                raise
+            logger.warning(f"Reconnected to GlobalDataStore after: {e}. Repeat {method_name}")
+            return getattr(self.shared_namespaces, method_name)(*arguments)
+
+    def register_namespace_policy(self, name: str, policy: NamespacePolicy):
+        # Policies are sent to the server on connect. Every worker sends the same policy.
+        self.namespace_policies[name] = policy
+        if self.connected:
+            self.call("configure_namespace", *self.get_policy_arguments(name, policy))
+
+    def configure_namespace(self, name: str, policy: NamespacePolicy):
+        self.shared_namespaces.configure_namespace(*self.get_policy_arguments(name, policy))
+
+    @staticmethod
+    def get_policy_arguments(name: str, policy: NamespacePolicy) -> Tuple:
+        return name, policy.ttl, policy.max_size, policy.sliding, policy.persistent
 
     def stop(self):
+        if self.transport == TRANSPORT_UNIX_SOCKET:
+            try:
+                UnixSocketDataClient(self.socket_path, self.authkey).release()
+            except Exception as e:
+                logger.error(f"Error during release of shared namespaces: {e}")
+            if self.socket_server:
+                self.socket_server.stop()
+            return
+
+        try:
+            self.manager.shared_namespaces().release()
+        except Exception as e:
+            logger.error(f"Error during release of shared namespaces: {e}")
         self.manager.shutdown()
 
     def update(self, key: str, value: Dict[Any, Any]):
-        self.shared_data.update({key: value})
+        self.call("set_data", key, value)
 
     def get_data(self, key: str, default: Any) -> Dict[Any, Any]:
-        return self.shared_data.get(key) or default
+        return self.call("get_data", key) or default
 
     def delete_key(self, key_name: str):
-        self.update({key_name: None})
+        self.call("delete_namespace", key_name)
+
+    def get_item(self, name: str, key: Any, default: Any = None) -> Any:
+        return self.call("get_item", name, key, default)
+
+    def lookup_item(self, name: str, key: Any) -> Tuple[bool, Any]:
+        return self.call("lookup_item", name, key)
+
+    def touch(self, name: str, key: Any) -> bool:
+        return self.call("touch", name, key)
+
+    def is_persistent(self, name: str) -> bool:
+        return self.call("is_persistent", name)
+
+    def configure_metrics(self, enabled=True, payload_sizes=False):
+        self.metrics.configure(enabled, payload_sizes)
+        if self.connected:
+            self.execute("configure_metrics", (enabled, payload_sizes))
+
+    def get_metrics(self) -> Dict:
+        # client: operations of this worker process, server: operations of all workers
+        return {"client": self.metrics.get_metrics(), "server": self.execute("get_metrics", ())}
+
+    def reset_metrics(self):
+        self.metrics.reset()
+        self.execute("reset_metrics", ())
+
+    def get_version(self, name: str) -> int:
+        if self.versions and self.versions.is_released():
+            # the server was restarted, all near caches must be refreshed
+            self.reconnect()
+        if self.versions:
+            return self.versions.get_version(name)
+        return self.call("get_version", name)
+
+    def set_item(self, name: str, key: Any, value: Any):
+        self.call("set_item", name, key, value)
+
+    def delete_item(self, name: str, key: Any) -> bool:
+        return self.call("delete_item", name, key)
+
+    def contains_item(self, name: str, key: Any) -> bool:
+        return self.call("contains_item", name, key)
+
+    def get_keys(self, name: str) -> List:
+        return self.call("get_keys", name)
+
+    def get_length(self, name: str) -> int:
+        return self.call("get_length", name)
+
+    def update_many(self, name: str, items: Dict):
+        self.call("update_many", name, items)
+
+    def get_many(self, name: str, keys: List) -> Dict:
+        return self.call("get_many", name, keys)
+
+    def increment(self, name: str, key: Any, amount: int | float = 1, initial_value: int | float = 0) -> int | float:
+        return self.call("increment", name, key, amount, initial_value)
+
+    def setdefault(self, name: str, key: Any, default: Any = None) -> Any:
+        return self.call("setdefault", name, key, default)
+
+    def compare_and_swap(self, name: str, key: Any, expected_value: Any, new_value: Any) -> bool:
+        return self.call("compare_and_swap", name, key, expected_value, new_value)
+
+    def list_get(self, name: str, index: int | slice) -> Any:
+        return self.call("list_get", name, index)
+
+    def list_set(self, name: str, index: int | slice, value: Any):
+        self.call("list_set", name, index, value)
+
+    def list_delete(self, name: str, index: int | slice):
+        self.call("list_delete", name, index)
+
+    def list_insert(self, name: str, index: int, value: Any):
+        self.call("list_insert", name, index, value)
+
+    def list_append(self, name: str, value: Any) -> int:
+        return self.call("list_append", name, value)
+
+    def list_extend(self, name: str, values: List) -> int:
+        return self.call("list_extend", name, values)
+
+    def list_pop(self, name: str, index: int = -1) -> Any:
+        return self.call("list_pop", name, index)
+
+    def list_contains(self, name: str, value: Any) -> bool:
+        return self.call("list_contains", name, value)
 
 
 my_global_data_share = GlobalDataStore()
 
 
 class SharedDataProxyDict(MutableMapping):
-    def __init__(self, name: str, global_data_store: GlobalDataStore):
+    def __init__(self, name: str, global_data_store: GlobalDataStore, near_cache=False, policy: NamespacePolicy = None,
+                 near_cache_size: int = 10000):
         self.name = name
         self.global_data_store = global_data_store
+        self.near_cache_enabled = near_cache
+        # least recently used found entries of this process. Misses are not cached, unknown keys would fill it.
+        self.near_cache: OrderedDict[Any, Tuple[bool, Any]] = OrderedDict()
+        self.near_cache_size = near_cache_size
+        self.near_cache_version = None
+        self.policy = policy
+        self.touch_times: Dict[Any, float] = {}
+        if policy:
+            global_data_store.register_namespace_policy(name, policy)
 
     def get_data(self) -> Dict:
         return dict(self.global_data_store.get_data(self.name, {}))
 
+    def is_persistent(self) -> bool:
+        # False, if the server was started without a persistence directory
+        return self.global_data_store.is_persistent(self.name)
+
+    def lookup(self, key) -> Tuple[bool, Any]:
+        # The version is read before the value. A concurrent write always leads to a refresh on the next access.
+        version = self.global_data_store.get_version(self.name)
+        # the versions of a restarted server start again
+        version = (self.global_data_store.generation, version)
+        if version != self.near_cache_version:
+            self.near_cache = OrderedDict()
+            self.touch_times = {}
+            self.near_cache_version = version
+
+        entry = self.near_cache.get(key)
+        if entry is not None:
+            self.near_cache.move_to_end(key)
+            if self.is_touch_required(key):
+                # Near cache hits do not reach the server. The expiry time of the entry is slid from time to time.
+                self.touch_times[key] = time.time()
+                if not self.global_data_store.touch(self.name, key):
+                    self.remove_from_near_cache(key)
+                    entry = None
+
+        if entry is None:
+            entry = self.global_data_store.lookup_item(self.name, key)
+            if entry[0]:
+                self.near_cache[key] = entry
+                self.touch_times[key] = time.time()
+                while len(self.near_cache) > self.near_cache_size:
+                    self.remove_from_near_cache(next(iter(self.near_cache)))
+
+        return entry
+
+    def remove_from_near_cache(self, key):
+        self.near_cache.pop(key, None)
+        self.touch_times.pop(key, None)
+
+    def is_touch_required(self, key) -> bool:
+        if not self.policy or not self.policy.ttl:
+            return False
+        return time.time() - self.touch_times.get(key, 0) > self.policy.ttl / 10
+
     def __getitem__(self, key):
-        return self.get_data().get(key)
+        if self.near_cache_enabled:
+            return self.lookup(key)[1]
+        return self.global_data_store.get_item(self.name, key)
 
     def __setitem__(self, key, value):
-        stored_dict = self.get_data()
-        stored_dict[key] = value
-        self.global_data_store.update(self.name, stored_dict)
+        self.global_data_store.set_item(self.name, key, value)
 
     def __delitem__(self, key):
-        stored_dict = self.get_data()
-        if key in stored_dict:
-            del stored_dict[key]
-            self.global_data_store.update(self.name, stored_dict)
+        self.global_data_store.delete_item(self.name, key)
+
+    def delete(self, key) -> bool:
+        # False, if there was no entry
+        return self.global_data_store.delete_item(self.name, key)
+
+    def clear(self):
+        # one call, the policy of the namespace is kept
+        self.global_data_store.delete_key(self.name)
 
     def __iter__(self):
-        # Fetch all keys by getting the entire dataset (assuming there's a method to get all keys)
-        return iter(self.get_data())
+        # Only the keys are transferred. Values are fetched one by one on access.
+        return iter(self.global_data_store.get_keys(self.name))
 
     def __len__(self):
-        # Fetch the length of the dataset
-        return len(self.get_data())
+        return self.global_data_store.get_length(self.name)
 
     def __repr__(self):
         # Fetch all data for a representation
         return repr(self.get_data())
 
     def __contains__(self, key) -> bool:
-        return key in self.get_data()
+        if self.near_cache_enabled:
+            return self.lookup(key)[0]
+        return self.global_data_store.contains_item(self.name, key)
+
+    def update(self, other=(), /, **kwargs):
+        items = dict(other, **kwargs)
+        if items:
+            self.global_data_store.update_many(self.name, items)
+
+    def get_many(self, keys: List) -> Dict:
+        return self.global_data_store.get_many(self.name, list(keys))
+
+    def increment(self, key, amount: int | float = 1, initial_value: int | float = 0) -> int | float:
+        return self.global_data_store.increment(self.name, key, amount, initial_value)
+
+    def setdefault(self, key, default=None):
+        return self.global_data_store.setdefault(self.name, key, default)
+
+    def compare_and_swap(self, key, expected_value, new_value) -> bool:
+        return self.global_data_store.compare_and_swap(self.name, key, expected_value, new_value)
 
 
 class SharedDataProxyList(MutableSequence):
-    def __init__(self, name: str, global_data_store: GlobalDataStore):
+    # Every operation is executed by the server. Only the affected values are transferred.
+    def __init__(self, name: str, global_data_store: GlobalDataStore, max_length: int = None):
         self.name = name
         self.global_data_store = global_data_store
+        if max_length:
+            global_data_store.register_namespace_policy(name, NamespacePolicy(max_size=max_length))
 
     def get_data(self) -> List:
         return list(self.global_data_store.get_data(self.name, []))
 
     def __getitem__(self, index):
-        return self.get_data()[index]
+        return self.global_data_store.list_get(self.name, index)
 
     def __setitem__(self, index, value):
-        data = self.get_data()
-        data[index] = value
-        self.global_data_store.update(self.name, data)
+        if isinstance(index, slice):
+            value = list(value)
+        self.global_data_store.list_set(self.name, index, value)
 
     def __delitem__(self, index):
-        data = self.get_data()
-        if index in data:
-            del data[index]
-            self.global_data_store.update(self.name, data)
+        self.global_data_store.list_delete(self.name, index)
 
     def __len__(self):
-        data = self.get_data()
-        return len(data)
+        return self.global_data_store.get_length(self.name)
+
+    def __iter__(self):
+        return iter(self.get_data())
 
     def insert(self, index, value):
-        data = self.get_data()
-        data.insert(index, value)
-        self.global_data_store.update(self.name, data)
+        self.global_data_store.list_insert(self.name, index, value)
+
+    def append(self, value):
+        self.global_data_store.list_append(self.name, value)
+
+    def extend(self, values):
+        self.global_data_store.list_extend(self.name, list(values))
+
+    def pop(self, index=-1):
+        return self.global_data_store.list_pop(self.name, index)
+
+    def clear(self):
+        self.global_data_store.delete_key(self.name)
 
     def __repr__(self):
         data = self.get_data()
         return repr(data)
 
-    def __contains__(self, key) -> bool:
-        return key in self.get_data()
+    def __contains__(self, value) -> bool:
+        return self.global_data_store.list_contains(self.name, value)
 
 
 def get_unique_id() -> str:
@@ -128,12 +973,34 @@ def get_unique_id() -> str:
     return f"{caller_frame_info.filename}_{caller_frame_info.lineno}"
 
 
-def shared_dict() -> Dict:
-    return SharedDataProxyDict(name=get_unique_id(), global_data_store=my_global_data_share)
+BACKEND_GLOBAL_DATA_STORE = "global_data_store"
+BACKEND_SHARED_MEMORY = "shared_memory"
+
+
+def shared_dict(near_cache=False, backend: str = BACKEND_GLOBAL_DATA_STORE, ttl: float = None, max_size: int = None,
+                sliding=True, persistent=False, name: str = None) -> Dict:
+    # ttl: seconds until an entry expires. Every access restarts the ttl, unless sliding is False.
+    # max_size: the least recently used entries are evicted beyond this size.
+    # persistent: the entries survive a restart, if the server was started with a persistence directory.
+    # name: identifies the namespace, by default the file and line of the caller. Required for persistent namespaces,
+    # the persisted entries must be found again after the code was changed or installed somewhere else.
+    if persistent and not name:
+        raise Exception("A persistent shared_dict requires a stable name")
+    if backend == BACKEND_SHARED_MEMORY:
+        if ttl or max_size or persistent:
+            raise Exception(f"ttl, max_size and persistent are not supported by the shared_dict backend: {backend}")
+        # read-mostly data: workers read without IPC, every write publishes a new immutable version
+        return SharedMemoryDict(name=name or get_unique_id())
+    if backend != BACKEND_GLOBAL_DATA_STORE:
+        raise Exception(f"Unknown shared_dict backend: {backend}")
+
+    policy = NamespacePolicy(ttl, max_size, sliding, persistent) if ttl or max_size or persistent else None
+    return SharedDataProxyDict(name=name or get_unique_id(), global_data_store=my_global_data_share, near_cache=near_cache, policy=policy)
 
 
-def shared_list() -> List:
-    return SharedDataProxyList(name=get_unique_id(), global_data_store=my_global_data_share)
+def shared_list(max_length: int = None) -> List:
+    # max_length: ring buffer, the oldest entries are dropped beyond this length
+    return SharedDataProxyList(name=get_unique_id(), global_data_store=my_global_data_share, max_length=max_length)
 
 
 class GlobalDataShareContext:
@@ -149,23 +1016,32 @@ class GlobalDataShareContext:
         pass
 
 
-def global_data_share(start_global_data_share_server: bool) -> GlobalDataShareContext:
+def global_data_share(start_global_data_share_server: bool, transport: str = TRANSPORT_MANAGER, socket_path: str = None) -> GlobalDataShareContext:
+    my_global_data_share.set_transport(transport, socket_path)
     if start_global_data_share_server:
         init_global_data_share()
 
     return GlobalDataShareContext(my_global_data_share)
 
 
-def init_global_data_share():
+def init_global_data_share(transport: str = None, socket_path: str = None, persistence_directory: str = None):
+    # the shared memory dicts of this run, a run that was not stopped may have left segments behind
+    os.environ.setdefault(RUN_ID_VARIABLE, uuid.uuid4().hex)
+    if transport:
+        my_global_data_share.set_transport(transport, socket_path)
+    persistence_directory = persistence_directory or os.getenv("GLOBAL_DATA_DIRECTORY")
+    if persistence_directory:
+        my_global_data_share.set_persistence(persistence_directory)
     my_global_data_share.start()
 
 
 def destroy_global_data_share():
     my_global_data_share.stop()
+    release_shared_memory_dicts()
 
 
 def destroy_global_data_share_on_exit():
     import signal
     import atexit
-    signal.signal(signal.SIGTERM, lambda *x: global_data_share.stop())
-    atexit.register(lambda *x: global_data_share.stop())
+    signal.signal(signal.SIGTERM, lambda *x: destroy_global_data_share())
+    atexit.register(lambda *x: destroy_global_data_share())
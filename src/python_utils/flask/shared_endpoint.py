@@ -0,0 +1,40 @@
+from typing import Callable
+
+from flask import Blueprint, request
+
+from python_utils.flask.endpoint import response_json
+from python_utils.flask.shared import my_global_data_share
+
+
+def create_shared_endpoint(auth_decorator: Callable[[Callable], Callable]) -> Blueprint:
+    # auth_decorator protects every route, e.g. token_required() of the jira security
+    shared_endpoint = Blueprint('shared_endpoint', __name__, url_prefix='/rest/shared')
+
+    @shared_endpoint.route('/metrics', methods=["GET"])
+    @auth_decorator
+    def get_metrics():
+        try:
+            return response_json(my_global_data_share.get_metrics())
+        except Exception as e:
+            return response_json({"error": str(e)}), 400
+
+    @shared_endpoint.route('/metrics', methods=["DELETE"])
+    @auth_decorator
+    def delete_metrics():
+        try:
+            my_global_data_share.reset_metrics()
+            return response_json({"result": "OK"})
+        except Exception as e:
+            return response_json({"error": str(e)}), 400
+
+    @shared_endpoint.route('/metrics/config', methods=["POST"])
+    @auth_decorator
+    def post_metrics_config():
+        try:
+            config = request.json or {}
+            my_global_data_share.configure_metrics(bool(config.get("enabled", True)), bool(config.get("payloadSizes", False)))
+            return response_json({"result": "OK"})
+        except Exception as e:
+            return response_json({"error": str(e)}), 400
+
+    return shared_endpoint
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+from collections.abc import MutableMapping
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+
+from filelock import FileLock
+
+VERSION_FORMAT = struct.Struct("Q")
+LENGTH_FORMAT = struct.Struct("Q")
+# Set by the process, which starts the global data share, and inherited by the workers. Segments of a run, which
+# was not stopped, are not found by the next run.
+RUN_ID_VARIABLE = "GLOBAL_DATA_RUN_ID"
+
+shared_memory_dict_names: List[str] = []
+
+
+def create_segment_name(name: str) -> str:
+    run_id = os.getenv(RUN_ID_VARIABLE, "")
+    return f"pu_{hashlib.sha1(f'{run_id}|{name}'.encode('utf-8')).hexdigest()[:20]}"
+
+
+def get_lock_filename(segment_name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{segment_name}.lock")
+
+
+def open_shared_memory(name: str = None, create=False, size: int = 0) -> SharedMemory:
+    # The segment is released explicitly. The resource tracker must not unlink it when a worker exits.
+    try:
+        return SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        shared_memory = SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(shared_memory._name, "shared_memory")
+        return shared_memory
+
+
+def unlink_shared_memory(shared_memory: SharedMemory):
+    shared_memory.close()
+    if not hasattr(shared_memory, "_track"):
+        # before python 3.13 unlink() always unregisters from the resource tracker
+        resource_tracker.register(shared_memory._name, "shared_memory")
+    shared_memory.unlink()
+
+
+def unlink_shared_memory_by_name(name: str):
+    try:
+        unlink_shared_memory(open_shared_memory(name=name))
+    except FileNotFoundError:
+        pass
+
+
+class SharedMemoryDict(MutableMapping):
+    # Read-mostly dict for all workers of a host. The current data is an immutable, pickled snapshot in its own
+    # shared memory segment. A small pointer segment holds the current version. Readers only compare the version and
+    # deserialize a snapshot once per version. Writers publish a complete new version under a file lock.
+
+    def __init__(self, name: str):
+        self.name = name
+        # bound on first use, the run id is set after the module level dicts were created
+        self.segment_name: str = None
+        self.lock: FileLock = None
+        self.local_lock = threading.Lock()
+        self.pointer: SharedMemory = None
+        self.snapshot: Tuple[int, Dict] = (0, {})
+        shared_memory_dict_names.append(name)
+
+    def get_segment_name(self) -> str:
+        if self.segment_name is None:
+            segment_name = create_segment_name(self.name)
+            self.lock = FileLock(get_lock_filename(segment_name))
+            self.segment_name = segment_name
+        return self.segment_name
+
+    def get_lock(self) -> FileLock:
+        self.get_segment_name()
+        return self.lock
+
+    def get_pointer(self) -> SharedMemory:
+        if self.pointer is None:
+            with self.local_lock:
+                if self.pointer is None:
+                    self.pointer = self.open_pointer()
+        return self.pointer
+
+    def open_pointer(self) -> SharedMemory:
+        segment_name = self.get_segment_name()
+        try:
+            return open_shared_memory(name=segment_name)
+        except FileNotFoundError:
+            with self.get_lock():
+                try:
+                    return open_shared_memory(name=segment_name)
+                except FileNotFoundError:
+                    pointer = open_shared_memory(name=segment_name, create=True, size=VERSION_FORMAT.size)
+                    VERSION_FORMAT.pack_into(pointer.buf, 0, 0)
+                    return pointer
+
+    def get_version(self) -> int:
+        return VERSION_FORMAT.unpack_from(self.get_pointer().buf, 0)[0]
+
+    def get_version_segment_name(self, version: int) -> str:
+        return f"{self.get_segment_name()}_{version}"
+
+    def get_data(self) -> Dict:
+        while True:
+            version = self.get_version()
+            local_version, data = self.snapshot
+            if version == local_version:
+                return data
+
+            try:
+                data = self.read_version(version)
+            except FileNotFoundError:
+                # replaced by a newer version in the meantime
+                continue
+
+            self.snapshot = (version, data)
+            return data
+
+    def read_version(self, version: int) -> Dict:
+        if version == 0:
+            return {}
+
+        segment = open_shared_memory(name=self.get_version_segment_name(version))
+        try:
+            length = LENGTH_FORMAT.unpack_from(segment.buf, 0)[0]
+            return pickle.loads(bytes(segment.buf[LENGTH_FORMAT.size:LENGTH_FORMAT.size + length]))
+        finally:
+            segment.close()
+
+    def publish(self, data: Dict):
+        with self.get_lock():
+            self.write_version(dict(data))
+
+    def modify(self, modification):
+        with self.get_lock():
+            data = dict(self.get_data())
+            modification(data)
+            self.write_version(data)
+
+    def write_version(self, data: Dict):
+        # must be called with the file lock held
+        previous_version = self.get_version()
+        version = previous_version + 1
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        segment_name = self.get_version_segment_name(version)
+        unlink_shared_memory_by_name(segment_name)
+        segment = open_shared_memory(name=segment_name, create=True, size=LENGTH_FORMAT.size + len(payload))
+        LENGTH_FORMAT.pack_into(segment.buf, 0, len(payload))
+        segment.buf[LENGTH_FORMAT.size:LENGTH_FORMAT.size + len(payload)] = payload
+        segment.close()
+
+        VERSION_FORMAT.pack_into(self.get_pointer().buf, 0, version)
+        self.snapshot = (version, data)
+
+        if previous_version:
+            unlink_shared_memory_by_name(self.get_version_segment_name(previous_version))
+
+    def release(self):
+        if self.pointer:
+            self.pointer.close()
+            self.pointer = None
+        self.snapshot = (0, {})
+        release_shared_memory_dict(self.get_segment_name())
+
+    def __getitem__(self, key):
+        return self.get_data().get(key)
+
+    def __setitem__(self, key, value):
+        self.modify(lambda data: data.__setitem__(key, value))
+
+    def __delitem__(self, key):
+        self.modify(lambda data: data.pop(key, None))
+
+    def update(self, other=(), /, **kwargs):
+        items = dict(other, **kwargs)
+        self.modify(lambda data: data.update(items))
+
+    def __iter__(self):
+        return iter(list(self.get_data()))
+
+    def __len__(self):
+        return len(self.get_data())
+
+    def __contains__(self, key) -> bool:
+        return key in self.get_data()
+
+    def __repr__(self):
+        return repr(self.get_data())
+
+
+def release_shared_memory_dict(segment_name: str):
+    with FileLock(get_lock_filename(segment_name)):
+        try:
+            pointer = open_shared_memory(name=segment_name)
+        except FileNotFoundError:
+            return
+
+        version = VERSION_FORMAT.unpack_from(pointer.buf, 0)[0]
+        if version:
+            unlink_shared_memory_by_name(f"{segment_name}_{version}")
+        unlink_shared_memory(pointer)
+
+
+def release_shared_memory_dicts():
+    for name in shared_memory_dict_names:
+        release_shared_memory_dict(create_segment_name(name))
@@ -0,0 +1,123 @@
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Dict, List, Tuple
+
+# Upper bounds of the latency buckets in seconds. The last bucket counts all slower operations.
+LATENCY_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+
+
+def get_payload_size(payload: Any) -> int:
+    try:
+        return len(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class OperationMetrics:
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def record(self, duration: float, error: bool, request_size: int, response_size: int):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.request_bytes += request_size
+        self.response_bytes += response_size
+
+    def to_json(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.count if self.count else 0,
+            "max_time": self.max_time,
+            "histogram": self.get_histogram(),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes
+        }
+
+    def get_histogram(self) -> List[Dict]:
+        histogram = []
+        for upper_bound, count in zip(LATENCY_BUCKETS + [None], self.buckets):
+            if count:
+                histogram.append({"le": upper_bound if upper_bound is not None else "inf", "count": count})
+        return histogram
+
+
+class SharedMetrics:
+    # Counters and latency histograms per namespace and operation of the GlobalDataStore.
+    # Payload sizes are measured by pickling the arguments and results. This is disabled by default.
+
+    def __init__(self, enabled=True, payload_sizes=False):
+        self.enabled = enabled
+        self.payload_sizes = payload_sizes
+        self.operations: Dict[Tuple[str, str], OperationMetrics] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, enabled=True, payload_sizes=False):
+        self.enabled = enabled
+        self.payload_sizes = payload_sizes
+
+    def record(self, namespace: str, operation: str, duration: float, error=False, arguments: Any = None,
+               result: Any = None):
+        request_size = response_size = 0
+        if self.payload_sizes:
+            request_size = get_payload_size(arguments)
+            response_size = get_payload_size(result)
+
+        with self.lock:
+            operation_metrics = self.operations.get((namespace, operation))
+            if operation_metrics is None:
+                operation_metrics = OperationMetrics()
+                self.operations[(namespace, operation)] = operation_metrics
+            operation_metrics.record(duration, error, request_size, response_size)
+
+    def get_metrics(self) -> Dict:
+        # {namespace: {operation: metrics}}, namespaces with most time spent first
+        with self.lock:
+            metrics: Dict[str, Dict] = {}
+            for (namespace, operation), operation_metrics in self.operations.items():
+                metrics.setdefault(namespace, {})[operation] = operation_metrics.to_json()
+
+        return dict(sorted(metrics.items(), key=lambda entry: -sum(
+            operation_metrics["total_time"] for operation_metrics in entry[1].values())))
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+
+
+def measured(operation_method):
+    # Records an operation of the SharedNamespaces. The first argument is the namespace.
+    operation = operation_method.__name__
+
+    @wraps(operation_method)
+    def decorator(self, namespace: str, *arguments, **kwargs):
+        metrics: SharedMetrics = self.metrics
+        if not metrics.enabled:
+            return operation_method(self, namespace, *arguments, **kwargs)
+
+        start_time = time.perf_counter()
+        error = True
+        result = None
+        try:
+            result = operation_method(self, namespace, *arguments, **kwargs)
+            error = False
+            return result
+        finally:
+            metrics.record(namespace, operation, time.perf_counter() - start_time, error, arguments, result)
+
+    return decorator
@@ -0,0 +1,219 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+HEADER = struct.Struct(">I")
+
+SNAPSHOT_FILENAME = "global_data.snapshot"
+LOG_FILENAME = "global_data.log"
+
+RECORD_SET = "set"
+RECORD_DELETE = "delete"
+RECORD_RESET = "reset"
+
+# a slid expiry time is logged again, when it moved by this part of the ttl
+SLIDE_LOG_FRACTION = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+def encode_records(records: List[Tuple]) -> bytes:
+    frames = []
+    for record in records:
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        frames.append(HEADER.pack(len(data)) + data)
+    return b"".join(frames)
+
+
+def read_records(filename: str) -> List[Tuple]:
+    records = []
+    if not os.path.exists(filename):
+        return records
+
+    with open(filename, "rb") as file:
+        while True:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                break
+            (length,) = HEADER.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                # incomplete last record after a crash
+                break
+            records.append(pickle.loads(data))
+
+    return records
+
+
+class NamespacePersistence:
+    # Persists chosen namespaces of the SharedNamespaces in the server process. Changed keys are collected in memory
+    # and appended periodically to a log. The log is compacted into a full snapshot when it exceeds compaction_size.
+    # On start-up the snapshot and the log are read in bulk. A namespace is restored, when it is configured as
+    # persistent again. Restored namespaces that are not configured (yet) are kept in the snapshot.
+    # Records: (type, namespace, key, value, expiry time)
+
+    def __init__(self, directory: str, interval: float = 5, compaction_size: int = 4 * 1024 * 1024):
+        self.directory = directory
+        self.interval = interval
+        self.compaction_size = compaction_size
+        self.snapshot_filename = os.path.join(directory, SNAPSHOT_FILENAME)
+        self.log_filename = os.path.join(directory, LOG_FILENAME)
+        self.namespaces: Set[str] = set()
+        self.restored_namespaces: Dict[str, Tuple[Dict, Dict[Any, float]]] = {}
+        # the expiry times in the log or snapshot, to throttle the records of slid expiry times
+        self.logged_expiry_times: Dict[str, Dict[Any, float]] = {}
+        self.changed_keys: Dict[str, Set] = {}
+        self.reset_namespaces: Set[str] = set()
+        self.file_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flusher: threading.Thread = None
+
+    def restore(self):
+        # namespace: (data, expiry times)
+        restored_namespaces: Dict[str, Tuple[Dict, Dict[Any, float]]] = {}
+        if os.path.exists(self.snapshot_filename):
+            with open(self.snapshot_filename, "rb") as file:
+                restored_namespaces = pickle.load(file)
+
+        for record_type, namespace, key, value, expiry_time in read_records(self.log_filename):
+            data, expiry_times = restored_namespaces.setdefault(namespace, ({}, {}))
+            if record_type == RECORD_SET:
+                data[key] = value
+                if expiry_time:
+                    expiry_times[key] = expiry_time
+                else:
+                    expiry_times.pop(key, None)
+            elif record_type == RECORD_DELETE:
+                data.pop(key, None)
+                expiry_times.pop(key, None)
+            elif record_type == RECORD_RESET:
+                data.clear()
+                expiry_times.clear()
+
+        self.restored_namespaces = restored_namespaces
+
+    def take_restored_namespace(self, namespace: str) -> Optional[Tuple[Dict, Dict[Any, float]]]:
+        restored_namespace = self.restored_namespaces.pop(namespace, None)
+        if restored_namespace:
+            self.logged_expiry_times[namespace] = dict(restored_namespace[1])
+        return restored_namespace
+
+    def add_namespace(self, namespace: str):
+        if namespace not in self.namespaces:
+            self.namespaces.add(namespace)
+            self.reset_namespaces.add(namespace)
+
+    def is_persistent(self, namespace: str) -> bool:
+        return namespace in self.namespaces
+
+    def mark_changed(self, namespace: str, keys: List = None):
+        # keys None: the whole namespace was replaced
+        if namespace not in self.namespaces:
+            return
+        if keys is None:
+            self.reset_namespaces.add(namespace)
+            self.changed_keys.pop(namespace, None)
+        else:
+            self.changed_keys.setdefault(namespace, set()).update(keys)
+
+    def mark_slid(self, namespace: str, key: Any, expiry_time: float, ttl: float):
+        # Reads slide the expiry time. It is logged again after a part of the ttl, not on every read.
+        # After a crash an entry expires at most that part of the ttl (plus the flush interval) early.
+        if namespace not in self.namespaces:
+            return
+        logged_expiry_time = self.logged_expiry_times.get(namespace, {}).get(key)
+        if logged_expiry_time is None or expiry_time - logged_expiry_time > ttl * SLIDE_LOG_FRACTION:
+            self.mark_changed(namespace, [key])
+
+    def collect_records(self, namespaces: Dict[str, Any], expiry_times: Dict[str, Dict[Any, float]]) -> bytes:
+        # must be called with the lock of the SharedNamespaces held
+        records = []
+        for namespace in self.reset_namespaces:
+            records.append((RECORD_RESET, namespace, None, None, None))
+            namespace_expiry_times = expiry_times.get(namespace, {})
+            for key, value in namespaces.get(namespace, {}).items():
+                records.append((RECORD_SET, namespace, key, value, namespace_expiry_times.get(key)))
+            self.logged_expiry_times[namespace] = dict(namespace_expiry_times)
+
+        for namespace, keys in self.changed_keys.items():
+            if namespace in self.reset_namespaces:
+                continue
+            data = namespaces.get(namespace, {})
+            namespace_expiry_times = expiry_times.get(namespace, {})
+            logged_expiry_times = self.logged_expiry_times.setdefault(namespace, {})
+            for key in keys:
+                if key in data:
+                    records.append((RECORD_SET, namespace, key, data[key], namespace_expiry_times.get(key)))
+                    logged_expiry_times[key] = namespace_expiry_times.get(key)
+                else:
+                    records.append((RECORD_DELETE, namespace, key, None, None))
+                    logged_expiry_times.pop(key, None)
+
+        self.reset_namespaces = set()
+        self.changed_keys = {}
+        # serialized now, the values may be changed after the lock is released
+        return encode_records(records)
+
+    def collect_snapshot(self, namespaces: Dict[str, Any], expiry_times: Dict[str, Dict[Any, float]]) -> bytes:
+        # must be called with the lock of the SharedNamespaces held. The expiry times slid by reads are saved here.
+        self.reset_namespaces = set()
+        self.changed_keys = {}
+        snapshot = dict(self.restored_namespaces)
+        for namespace in self.namespaces:
+            snapshot[namespace] = (dict(namespaces.get(namespace, {})), dict(expiry_times.get(namespace, {})))
+            self.logged_expiry_times[namespace] = dict(expiry_times.get(namespace, {}))
+        return pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def flush(self, collect: Callable[[Callable], Any]):
+        # collect executes the given function with the lock of the SharedNamespaces held
+        with self.file_lock:
+            if self.get_log_size() > self.compaction_size:
+                self.write_snapshot(collect(self.collect_snapshot))
+                return
+
+            records = collect(self.collect_records)
+            if records:
+                with open(self.log_filename, "ab") as file:
+                    file.write(records)
+                    file.flush()
+                    os.fsync(file.fileno())
+
+    def compact(self, collect: Callable[[Callable], Any]):
+        with self.file_lock:
+            self.write_snapshot(collect(self.collect_snapshot))
+
+    def write_snapshot(self, snapshot: bytes):
+        temporary_filename = f"{self.snapshot_filename}.tmp"
+        with open(temporary_filename, "wb") as file:
+            file.write(snapshot)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_filename, self.snapshot_filename)
+        # the log is covered by the snapshot now
+        with open(self.log_filename, "wb"):
+            pass
+
+    def get_log_size(self) -> int:
+        try:
+            return os.path.getsize(self.log_filename)
+        except FileNotFoundError:
+            return 0
+
+    def start(self, collect: Callable[[Callable], Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        self.flusher = threading.Thread(target=self.run_flusher, args=(collect,), name="NamespacePersistence", daemon=True)
+        self.flusher.start()
+
+    def run_flusher(self, collect: Callable[[Callable], Any]):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.flush(collect)
+            except Exception as e:
+                logger.error(f"Error during flush of shared namespaces: {e}")
+
+    def stop(self, collect: Callable[[Callable], Any]):
+        self.stop_event.set()
+        self.compact(collect)
@@ -0,0 +1,238 @@
+import hashlib
+import hmac
+import os
+import pickle
+import socket
+import socketserver
+import stat
+import struct
+import threading
+from multiprocessing import AuthenticationError, Process
+from typing import Any, Callable, List, Tuple
+
+HEADER = struct.Struct(">I")
+
+# Both sides prove the knowledge of the authkey before any pickle is exchanged, like multiprocessing.connection
+CHALLENGE_SIZE = 32
+DIGEST_SIZE = hashlib.sha256().digest_size
+WELCOME = b"#WELCOME#"
+FAILURE = b"#FAILURE#"
+
+
+def send_frame(connection: socket.socket, payload: Any):
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    connection.sendall(HEADER.pack(len(data)) + data)
+
+
+def receive_frame(connection_file) -> Any:
+    header = connection_file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise EOFError("Connection closed")
+
+    (length,) = HEADER.unpack(header)
+    data = connection_file.read(length)
+    if len(data) < length:
+        raise EOFError("Connection closed")
+
+    return pickle.loads(data)
+
+
+def read_exactly(connection_file, size: int) -> bytes:
+    data = connection_file.read(size)
+    if len(data) < size:
+        raise EOFError("Connection closed")
+    return data
+
+
+def create_digest(authkey: bytes, challenge: bytes) -> bytes:
+    return hmac.new(authkey, challenge, hashlib.sha256).digest()
+
+
+def deliver_challenge(connection: socket.socket, connection_file, authkey: bytes):
+    challenge = os.urandom(CHALLENGE_SIZE)
+    connection.sendall(challenge)
+    if not hmac.compare_digest(read_exactly(connection_file, DIGEST_SIZE), create_digest(authkey, challenge)):
+        connection.sendall(FAILURE)
+        raise AuthenticationError("Digest received was wrong")
+    connection.sendall(WELCOME)
+
+
+def answer_challenge(connection: socket.socket, connection_file, authkey: bytes):
+    challenge = read_exactly(connection_file, CHALLENGE_SIZE)
+    connection.sendall(create_digest(authkey, challenge))
+    if read_exactly(connection_file, len(WELCOME)) != WELCOME:
+        raise AuthenticationError("Digest sent was rejected")
+
+
+def create_private_directory(directory: str):
+    # The socket of the default path is created in a directory, which only the current user can access
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise Exception(f"Socket directory is not private to the current user: {directory}")
+
+
+class UnixSocketRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            deliver_challenge(self.request, self.rfile, self.server.authkey)
+            answer_challenge(self.request, self.rfile, self.server.authkey)
+        except (AuthenticationError, EOFError, OSError):
+            return
+
+        shared_namespaces = self.server.shared_namespaces
+        while True:
+            try:
+                method_name, arguments = receive_frame(self.rfile)
+            except EOFError:
+                return
+
+            try:
+                if method_name.startswith("_"):
+                    raise Exception(f"Method not allowed: {method_name}")
+                result = (True, getattr(shared_namespaces, method_name)(*arguments))
+            except Exception as e:
+                result = (False, e)
+
+            send_frame(self.request, result)
+
+
+class UnixSocketDataServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, shared_namespaces, authkey: bytes):
+        self.shared_namespaces = shared_namespaces
+        self.authkey = authkey
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # the socket is created with the permissions 0600, there is no moment other users can connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, UnixSocketRequestHandler)
+        finally:
+            os.umask(umask)
+
+
+def serve_shared_namespaces(socket_path: str, get_shared_namespaces: Callable, authkey: bytes, ready_event=None):
+    with UnixSocketDataServer(socket_path, get_shared_namespaces(), authkey) as server:
+        if ready_event:
+            ready_event.set()
+        server.serve_forever()
+
+
+class UnixSocketDataServerProcess:
+
+    def __init__(self, socket_path: str, get_shared_namespaces: Callable, authkey: bytes):
+        self.socket_path = socket_path
+        self.get_shared_namespaces = get_shared_namespaces
+        self.authkey = authkey
+        self.process: Process = None
+
+    def start(self, timeout: float = 10):
+        from multiprocessing import Event
+        ready_event = Event()
+        self.process = Process(target=serve_shared_namespaces,
+                               args=(self.socket_path, self.get_shared_namespaces, self.authkey, ready_event),
+                               name="UnixSocketDataServer", daemon=True)
+        self.process.start()
+        if not ready_event.wait(timeout):
+            raise Exception(f"UnixSocketDataServer not started within {timeout}s: {self.socket_path}")
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class UnixSocketDataClient:
+    # Same interface as the SharedNamespaces proxy of the SyncManager. Every thread uses its own persistent connection.
+
+    def __init__(self, socket_path: str, authkey: bytes):
+        self.socket_path = socket_path
+        self.authkey = authkey
+        self.local = threading.local()
+
+    def get_connection(self) -> Tuple[socket.socket, Any]:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                client_socket.connect(self.socket_path)
+                connection_file = client_socket.makefile("rb")
+                answer_challenge(client_socket, connection_file, self.authkey)
+                deliver_challenge(client_socket, connection_file, self.authkey)
+            except BaseException:
+                client_socket.close()
+                raise
+            connection = (client_socket, connection_file)
+            self.local.connection = connection
+
+        return connection
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection:
+            self.local.connection = None
+            connection[1].close()
+            connection[0].close()
+
+    def call(self, method_name: str, *arguments) -> Any:
+        return self.call_many([(method_name, arguments)])[0]
+
+    def call_many(self, calls: List[Tuple[str, Tuple]]) -> List[Any]:
+        # Pipelined: all requests are sent before the first response is read
+        client_socket, connection_file = self.get_connection()
+        try:
+            for call in calls:
+                send_frame(client_socket, call)
+            responses = [receive_frame(connection_file) for _ in calls]
+        except Exception:
+            self.close()
+            raise
+
+        results = []
+        for successful, result in responses:
+            if not successful:
+                raise result
+            results.append(result)
+
+        return results
+
+    def pipeline(self) -> "UnixSocketPipeline":
+        return UnixSocketPipeline(self)
+
+    def __getattr__(self, method_name: str):
+        if method_name.startswith("_"):
+            raise AttributeError(method_name)
+
+        return lambda *arguments: self.call(method_name, *arguments)
+
+
+class UnixSocketPipeline:
+
+    def __init__(self, client: UnixSocketDataClient):
+        self.client = client
+        self.calls = []
+        self.results = None
+
+    def __getattr__(self, method_name: str):
+        if method_name.startswith("_"):
+            raise AttributeError(method_name)
+
+        return lambda *arguments: self.calls.append((method_name, arguments))
+
+    def execute(self) -> List[Any]:
+        calls, self.calls = self.calls, []
+        self.results = self.client.call_many(calls) if calls else []
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
@@ -0,0 +1,236 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from flask import Flask
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+
+SHARED_TIER_FILESYSTEM = "filesystem"
+SHARED_TIER_GLOBAL_DATA_STORE = "global_data_store"
+
+
+class CacheTierStatistics:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def to_json(self) -> Dict:
+        requests = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hitRatio": self.hits / requests if requests else None}
+
+
+class LocalCacheTier:
+    # Bounded by the size of the pickled values. The least recently used entries are evicted first.
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024, timeout: int = 5):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.size = 0
+        self.evictions = 0
+        self.entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self.statistics = CacheTierStatistics()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] <= time.time():
+                self.remove(key)
+                entry = None
+            if not entry:
+                self.statistics.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.statistics.hits += 1
+        return True, pickle.loads(entry[1])
+
+    def has(self, key: str) -> bool:
+        with self.lock:
+            entry = self.entries.get(key)
+            return bool(entry) and entry[0] > time.time()
+
+    def set(self, key: str, value: Any, timeout: int):
+        # timeout: of the shared entry, 0 never expires. Local entries expire after self.timeout at the latest.
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.remove(key)
+            if len(data) > self.max_size:
+                return
+            self.entries[key] = (time.time() + min(timeout or self.timeout, self.timeout), data)
+            self.size += len(data)
+            while self.size > self.max_size:
+                _, (_, evicted_data) = self.entries.popitem(last=False)
+                self.size -= len(evicted_data)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self.lock:
+            self.remove(key)
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= len(entry[1])
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.size = 0
+
+    def get_statistics(self) -> Dict:
+        with self.lock:
+            return {**self.statistics.to_json(), "entries": len(self.entries), "size": self.size,
+                    "maxSize": self.max_size, "evictions": self.evictions}
+
+
+class GlobalDataStoreCache(BaseCache):
+    # Shared tier in the GlobalDataStore. The server evicts the least recently used entries beyond the threshold.
+    # The threshold counts entries, not bytes: only the local tier is bounded by size.
+    # Entries are (expires, value), counters of inc/dec are numbers without timeout.
+
+    def __init__(self, threshold: int = 500, default_timeout: int = 300, entries: Dict = None):
+        from python_utils.flask.shared import shared_dict
+
+        super().__init__(default_timeout=default_timeout)
+        self.entries = entries if entries is not None else shared_dict(max_size=threshold or None)
+
+    def get_expires(self, timeout: int | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout else 0
+
+    @staticmethod
+    def is_expired(entry: Tuple[float, Any] | int | float) -> bool:
+        return isinstance(entry, tuple) and bool(entry[0]) and entry[0] <= time.time()
+
+    def get(self, key: str) -> Any:
+        entry = self.entries.get(key)
+        if entry is None or self.is_expired(entry):
+            return None
+        return entry[1] if isinstance(entry, tuple) else entry
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        self.entries[key] = (self.get_expires(timeout), value)
+        return True
+
+    def add(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        # atomic on the server, so it can be used as a lock between the workers
+        entry = (self.get_expires(timeout), value)
+        existing_entry = self.entries.setdefault(key, entry)
+        if existing_entry == entry:
+            return True
+        return self.is_expired(existing_entry) and self.entries.compare_and_swap(key, existing_entry, entry)
+
+    def inc(self, key: str, delta: int = 1) -> int | None:
+        # atomic on the server. A value set before becomes a counter first.
+        while True:
+            entry = self.entries.get(key)
+            if isinstance(entry, tuple):
+                value = None if self.is_expired(entry) else entry[1]
+                if value is not None and not isinstance(value, (int, float)):
+                    raise TypeError(f"Cache value of {key} is not a number: {type(value)}")
+                if not self.entries.compare_and_swap(key, entry, value or 0):
+                    continue
+            try:
+                return self.entries.increment(key, delta)
+            except TypeError:
+                # set by another worker meanwhile
+                continue
+
+    def dec(self, key: str, delta: int = 1) -> int | None:
+        return self.inc(key, -delta)
+
+    def delete(self, key: str) -> bool:
+        return self.entries.delete(key)
+
+    def has(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def clear(self) -> bool:
+        self.entries.clear()
+        return True
+
+
+class TieredCache(BaseCache):
+    # An in-process LRU in front of a cache shared by all workers. Local entries live for local_timeout
+    # seconds at most, so a worker sees changes of other workers after this time.
+    # add, inc and dec are atomic between the workers with the global_data_store tier only. The FileSystemCache
+    # checks and writes the file in two steps, so two workers can both add the same key.
+
+    def __init__(self, shared_tier: BaseCache, local_max_size: int = 64 * 1024 * 1024, local_timeout: int = 5,
+                 default_timeout: int = 300):
+        super().__init__(default_timeout=default_timeout)
+        self.shared_tier = shared_tier
+        self.local_tier = LocalCacheTier(local_max_size, local_timeout)
+        self.shared_statistics = CacheTierStatistics()
+
+    @classmethod
+    def factory(cls, app: Flask, config: Dict[str, Any], args, kwargs) -> "TieredCache":
+        shared_tier_type = config.get("CACHE_SHARED_TIER", SHARED_TIER_FILESYSTEM)
+        if shared_tier_type == SHARED_TIER_FILESYSTEM:
+            if not config["CACHE_DIR"]:
+                raise Exception(f"CACHE_DIR is required for the shared tier: {shared_tier_type}")
+            shared_tier = FileSystemCache(config["CACHE_DIR"], threshold=config["CACHE_THRESHOLD"],
+                                          default_timeout=config["CACHE_DEFAULT_TIMEOUT"])
+        elif shared_tier_type == SHARED_TIER_GLOBAL_DATA_STORE:
+            shared_tier = GlobalDataStoreCache(threshold=config["CACHE_THRESHOLD"],
+                                               default_timeout=config["CACHE_DEFAULT_TIMEOUT"])
+        else:
+            raise Exception(f"Unknown shared cache tier: {shared_tier_type}")
+
+        return cls(shared_tier, local_max_size=config.get("CACHE_LOCAL_MAX_SIZE", 64 * 1024 * 1024),
+                   local_timeout=config.get("CACHE_LOCAL_TIMEOUT", 5), default_timeout=config["CACHE_DEFAULT_TIMEOUT"])
+
+    def get(self, key: str) -> Any:
+        found, value = self.local_tier.get(key)
+        if found:
+            return value
+
+        value = self.shared_tier.get(key)
+        if value is None:
+            self.shared_statistics.misses += 1
+            return None
+        self.shared_statistics.hits += 1
+        self.local_tier.set(key, value, self.local_tier.timeout)
+        return value
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        result = self.shared_tier.set(key, value, timeout)
+        self.local_tier.set(key, value, self._normalize_timeout(timeout))
+        return result
+
+    def add(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        if not self.shared_tier.add(key, value, timeout):
+            return False
+        self.local_tier.set(key, value, self._normalize_timeout(timeout))
+        return True
+
+    def delete(self, key: str) -> bool:
+        self.local_tier.delete(key)
+        return self.shared_tier.delete(key)
+
+    def has(self, key: str) -> bool:
+        return self.local_tier.has(key) or self.shared_tier.has(key)
+
+    def inc(self, key: str, delta: int = 1) -> int | None:
+        self.local_tier.delete(key)
+        return self.shared_tier.inc(key, delta)
+
+    def dec(self, key: str, delta: int = 1) -> int | None:
+        self.local_tier.delete(key)
+        return self.shared_tier.dec(key, delta)
+
+    def clear(self) -> bool:
+        self.local_tier.clear()
+        return self.shared_tier.clear()
+
+    def get_statistics(self) -> Dict:
+        return {"local": self.local_tier.get_statistics(), "shared": self.shared_statistics.to_json()}
+
+    def reset_statistics(self):
+        self.local_tier.statistics = CacheTierStatistics()
+        self.local_tier.evictions = 0
+        self.shared_statistics = CacheTierStatistics()
@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import logging
+from typing import Dict, List
+
+import httpx
+from python_utils.jira.jira_client import JiraClient, JiraPageResult, get_matching_version_ids, has_fix_versions, \
+    convert_roadmap_issue_to_issue
+from python_utils.timestamp import now
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJiraClient:
+    # The API of the JiraClient for async views. Independent requests (pages, sprints per board, versions and
+    # the roadmap) run concurrently on the keep-alive connections of one httpx.AsyncClient, at most max_connections.
+    # Proxies (HTTPS_PROXY/NO_PROXY) and redirects are handled by httpx. The caches of the JiraClient are shared.
+    # The connections are bound to the event loop of the client. Flask runs every async view in a new event loop,
+    # so create the client in the view and close it there: the connections are reused within the view, not across requests.
+
+    def __init__(self, jira_client: JiraClient, max_connections: int = 10, timeout: float = 60):
+        self.jira_client = jira_client
+        self.hostname = jira_client.hostname
+        self.http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections),
+                                             timeout=timeout, follow_redirects=True)
+
+    async def paginate(self, jql: str, access_token: str, use_cache: bool, page_size=200, expand="changelog", cache_suffix="") -> (List[Dict], str):
+        page_result = await self.get_issues(jql=jql, access_token=access_token, use_cache=use_cache, start_at=0,
+                                            page_size=page_size, cache_suffix=cache_suffix)
+        page_results = [page_result]
+
+        if page_result.has_next():
+            # the cached pages were all returned with the first one, the missing pages are loaded at once
+            next_page_results = await asyncio.gather(*[
+                self.search(jql, access_token, expand, page_size, start_at)
+                for start_at in range(page_result.get_next_start_at(), page_result.get_total(), page_size)])
+            # the query cache returns the pages in the order they were added
+            for next_page_result in next_page_results:
+                self.jira_client.query_cache.add_page(f"{jql}_{cache_suffix}", next_page_result)
+            page_results.extend(next_page_results)
+
+        issues = []
+        for page_result in page_results:
+            issues.extend(page_result.get_issues())
+
+        return issues, page_results[-1].get_timestamp()
+
+    async def get_issues(self, jql: str, access_token: str, use_cache: bool, expand="changelog", page_size=200, start_at=0, cache_suffix="") -> JiraPageResult:
+
+        cache_id = f"{jql}_{cache_suffix}"
+
+        logger.debug(
+            f"get_issues(jql={jql}, use_cache={use_cache}, expand={expand}, page_size={page_size}, start_at={start_at}")
+
+        if use_cache:
+            jira_page = self.jira_client.query_cache.get_all_pages(cache_id, start_at)
+            if jira_page:
+                logger.info(
+                    f"Return cached issues for {cache_id}: Total={jira_page.get_total()} / issues: {len(jira_page.get_issues())}")
+                return jira_page
+
+        if self.jira_client.test_mode:
+            logger.info(f"TEST_MODE active. Return empty result for jql {jql}")
+            return JiraPageResult(start_at=0, total=0, timestamp=now(), issues=[])
+
+        jira_page = await self.search(jql, access_token, expand, page_size, start_at)
+
+        logger.info(f"Add {cache_id} to cache: {len(jira_page.get_issues())} items")
+        self.jira_client.query_cache.add_page(cache_id, jira_page)
+
+        return jira_page
+
+    async def search(self, jql: str, access_token: str, expand: str, page_size: int, start_at: int) -> JiraPageResult:
+        result = await self.get_json("/rest/api/2/search", access_token,
+                                     {"jql": jql, "expand": expand, "fields": "*all", "maxResults": page_size, "startAt": start_at})
+        return JiraPageResult(start_at=result["startAt"], total=result["total"], timestamp=now(), issues=result["issues"])
+
+    async def get_unreleased_versions(self, project_id: str, access_token: str) -> List[Dict[str, str]]:
+        versions = await self.get_versions(project_id, access_token)
+        return [version for version in versions if not version["released"]]
+
+    async def get_versions(self, project_id: str, access_token: str) -> List[Dict[str, str]]:
+
+        versions = self.jira_client.project_cache.get_versions(project_id)
+        if versions:
+            logger.info(
+                f"Return cached versions for {project_id}: {versions}")
+            return versions
+
+        versions = await self.get_json(f"/rest/api/2/project/{project_id}/versions", access_token)
+
+        logger.info(f"Add versions to cache: {len(versions)} items")
+        self.jira_client.project_cache.add_versions(project_id, versions)
+
+        return versions
+
+    async def get_roadmap(self, project_id: str, plan_id: int, scenario_id: int, fix_version_filters: List[str], access_token: str, use_cache=True) -> Dict:
+
+        roadmap = None
+        if use_cache:
+            roadmap = self.jira_client.roadmap_cache.get_roadmap(project_id, plan_id, scenario_id)
+
+        if roadmap:
+            unreleased_versions = await self.get_unreleased_versions(project_id, access_token)
+        else:
+            roadmap, unreleased_versions = await asyncio.gather(
+                self.get_roadmap_from_jira_backend(plan_id, scenario_id, access_token),
+                self.get_unreleased_versions(project_id, access_token))
+            self.jira_client.roadmap_cache.add_roadmap(project_id, plan_id, scenario_id, roadmap["issues"], roadmap["timestamp"])
+
+        version_ids = get_matching_version_ids(unreleased_versions, fix_version_filters)
+        roadmap_issues = [issue for issue in roadmap["issues"] if has_fix_versions(issue, version_ids)]
+        roadmap_issues = sorted(roadmap_issues, key=lambda issue: issue["values"]["lexoRank"])
+
+        return {"issues": [convert_roadmap_issue_to_issue(project_id, roadmap_issue) for roadmap_issue in roadmap_issues],
+                "timestamp": roadmap["timestamp"]}
+
+    async def get_roadmap_from_jira_backend(self, plan_id: int, scenario_id: int, access_token: str) -> Dict:
+        data = {"planId": int(plan_id), "scenarioId": int(scenario_id),
+                "filter": {"includeCompleted": True, "performDependencyCompletion": False, "includeIssueLinks": True}}
+
+        response = await self.http_client.post(f"{self.hostname}/rest/jpo/1.0/backlog", json=data,
+                                                headers=self.create_headers(access_token))
+        response.raise_for_status()
+
+        return {"issues": response.json()["issues"], "timestamp": now()}
+
+    async def get_sprints_for_project(self, project_id: str, name_filter: str, activated_date: str, access_token: str, force_reload=False) -> List[Dict[str, str]]:
+
+        if not force_reload:
+            sprints = self.jira_client.project_cache.get_sprints(project_id, name_filter, activated_date)
+            if sprints:
+                return sprints
+
+        boards = await self.get_boards_for_project(project_id, name_filter, access_token)
+        sprints_per_board = await asyncio.gather(*[
+            self.get_all_values(f"/rest/agile/1.0/board/{board['id']}/sprint", access_token) for board in boards])
+
+        sprint_ids = []
+        sprints = []
+        for board_sprints in sprints_per_board:
+            for sprint in board_sprints:
+                if "activatedDate" in sprint and sprint["activatedDate"] >= activated_date and sprint["id"] not in sprint_ids:
+                    sprint_ids.append(sprint["id"])
+                    sprints.append(sprint)
+
+        self.jira_client.project_cache.add_sprints(project_id, name_filter, activated_date, sprints)
+
+        return sprints
+
+    async def get_boards_for_project(self, project_id: str, name_filter: str, access_token: str) -> List[Dict[str, str]]:
+        result = await self.get_json("/rest/agile/1.0/board", access_token,
+                                     {"projectKeyOrId": project_id, "type": "scrum", "maxResults": 50})
+        boards = [board for board in result["values"] if name_filter in board["name"]]
+
+        return sorted(boards, key=lambda board: board["id"], reverse=False)
+
+    async def get_all_values(self, path: str, access_token: str, page_size: int = 50) -> List[Dict]:
+        # pages of the agile api until isLast
+        values = []
+        while True:
+            result = await self.get_json(path, access_token, {"startAt": len(values), "maxResults": page_size})
+            values.extend(result["values"])
+            if result.get("isLast", True) or not result["values"]:
+                return values
+
+    async def get_json(self, path: str, access_token: str, params: Dict = None):
+        response = await self.http_client.get(f"{self.hostname}{path}", params=params, headers=self.create_headers(access_token))
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def create_headers(access_token: str) -> Dict[str, str]:
+        # the same token formats as JiraClient.create_jira
+        if ":::" in access_token:
+            username_password = access_token.split(":::")
+            credentials = base64.b64encode(f"{username_password[0]}:{username_password[1]}".encode("utf-8")).decode("ascii")
+            return {"Accept": "application/json", "Authorization": f"Basic {credentials}"}
+        return {"Accept": "application/json", "Authorization": f"Bearer {access_token}"}
+
+    async def close(self):
+        await self.http_client.aclose()
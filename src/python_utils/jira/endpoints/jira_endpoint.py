@@ -2,12 +2,16 @@ import os
 import traceback
 from flask import Blueprint, request
 from python_utils.jira.jira_client import JiraClient
-from python_utils.flask.endpoint import response_json, destroy_endpoint, init_endpoint, response_cookie
+from python_utils.flask.endpoint import response_json, destroy_endpoint, init_endpoint, response_cookie, response_json_stream, \
+    response_csv_stream
+from python_utils.flask.csv_stream import create_columns
+from python_utils.flask.cache import cached_response, invalidate_responses
 from python_utils.env import inject_environment
 from python_utils.file import lookup_file, file_exists
 from python_utils.jira.jira_security import token_required, get_access_token
-from python_utils.jira.jira_security import read_tokens, write_tokens, register_token, logout, is_logged_in
-from typing import Dict
+from python_utils.jira.jira_security import read_tokens, write_tokens, are_tokens_persistent, register_token, logout, \
+    is_logged_in
+from typing import Dict, Iterator
 
 
 jira_endpoint = Blueprint('jira_endpoint', __name__, url_prefix='/rest/jira')
@@ -47,9 +51,12 @@ jira_client = create_jira_client()
 
 @jira_endpoint.route('/sprints/<project_id>/<name_filter>/<activated_date>', methods=["GET"])
 @token_required()
+@cached_response(ttl=300, unless=lambda: "force_reload" in request.args)
 def get_sprints_for_project(project_id: str, name_filter: str, activated_date: str):
 
     force_reload = (request.args["force_reload"] == "true") if "force_reload" in request.args else False
+    if force_reload:
+        invalidate_responses("jira_endpoint.get_sprints_for_project")
 
     return response_json(
         jira_client.get_sprints_for_project(project_id, name_filter, activated_date, access_token=get_access_token(), force_reload=force_reload))
@@ -66,27 +73,54 @@ def post_search():
         if not config.is_valid():
             return response_json({"error": f"Invalid request body. Expected JiraSearchConfig"}), 400
 
+        if request.args.get("format") == "csv":
+            # e.g. ?format=csv&column=key&column=fields.status.name
+            columns = request.args.getlist("column") or ["key", "fields.summary"]
+            access_token = get_access_token()
+            jira_page = jira_client.get_issues(jql=config.get_jql(), access_token=access_token, expand=expand, use_cache=config.is_use_cache(), page_size=config.get_page_size())
+            # Like the history stream: only a version, if all pages are known before the first byte (e.g. from the query cache)
+            version = None if jira_page.has_next() else f"search|{config.get_jql()}|{expand}|{jira_page.get_timestamp()}|csv|{columns}"
+            return response_csv_stream(iterate_search_issues(config, jira_page, access_token, expand), create_columns(columns), filename="issues.csv",
+                                       cache_key=version if config.is_use_cache() else None, version=version,
+                                       last_modified=jira_page.get_timestamp() if version else None)
+
         (issues, timestamp) = jira_client.paginate(jql=config.get_jql(), access_token=get_access_token(), expand=expand, use_cache=config.is_use_cache(), page_size=config.get_page_size())
-        return response_json({ "timestamp": timestamp, "issues": issues })
+        version = f"search|{config.get_jql()}|{expand}|{timestamp}"
+        return response_json_stream(issues, wrapper={"timestamp": timestamp}, items_key="issues",
+                                    cache_key=version if config.is_use_cache() else None, version=version, last_modified=timestamp)
 
     except Exception as e:
         print(e)
         print(traceback.format_exc())
         return response_json({"error": str(e)}), 400
 
+
+def iterate_search_issues(config: JiraSearchConfig, jira_page, access_token: str, expand: str) -> Iterator[Dict]:
+    # the next page is loaded, when the issues of the previous one are written
+    while True:
+        yield from jira_page.get_issues()
+        if not jira_page.has_next() or not jira_page.get_issues():
+            return
+
+        jira_page = jira_client.get_issues(jql=config.get_jql(), access_token=access_token, expand=expand, use_cache=config.is_use_cache(),
+                                           start_at=jira_page.get_next_start_at(), page_size=config.get_page_size())
+
 @init_endpoint
 @inject_environment({"TOKEN_FILENAME": lookup_file("storage/token.json")})
 def init_security(filename: str):
+    # With a persistence directory the global data share persists the tokens, the token file is imported once.
+    # Otherwise the token file is kept and written on shutdown.
     print(f"init_security: {filename}")
     if file_exists(filename):
         read_tokens(filename)
-        os.remove(filename)
+        if are_tokens_persistent():
+            os.remove(filename)
 
 
 @destroy_endpoint
 @inject_environment({"TOKEN_FILENAME": lookup_file("storage/token.json")})
 def shutdown_endpoint(filename: str):
-    if filename:
+    if filename and not are_tokens_persistent():
         write_tokens(filename)
 
 
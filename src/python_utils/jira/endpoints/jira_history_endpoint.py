@@ -1,10 +1,17 @@
+import base64
+import hashlib
+import json
 import traceback
 
-from flask import Blueprint, request
-from typing import Dict, List
+from flask import Blueprint, Response, request, stream_with_context
+from typing import Dict, List, Iterator
 from python_utils.jira.jira_client import JiraClient
 from python_utils.jira.jira_history import JiraHistory
-from python_utils.flask.endpoint import response_json, destroy_endpoint
+from python_utils.flask.endpoint import response_json, destroy_endpoint, response_json_stream, response_not_modified, \
+    set_version_headers, response_csv_stream
+from python_utils.flask.csv_stream import CsvColumn
+from python_utils.flask.json_encoder import encode_json
+from python_utils.flask.compression import compress_response
 from python_utils.env import inject_environment
 from python_utils.file import lookup_file
 from python_utils.jira.jira_security import token_required, get_access_token
@@ -34,6 +41,9 @@ class JiraHistoryConfig:
     def get_fields(self) -> Dict[str, str]:
         return self.jira_config["fields"]
 
+    def get_hash(self) -> str:
+        return hashlib.sha1(json.dumps(self.jira_config, sort_keys=True).encode("utf-8")).hexdigest()
+
 
 @inject_environment(
     {"JIRA_HOSTNAME": "",
@@ -69,3 +79,113 @@ def post_search_history(start_at: int):
 
 def convert_to_history_issues(issues: List[Dict], issues_fields: Dict[str, str]) -> List[Dict]:
     return JiraHistory(issues_fields=issues_fields).get_histories(issues)
+
+
+@jira_history_endpoint.route('/stream', methods=["POST"])
+@token_required()
+def post_stream_history():
+    # Streams the history of all issues of the JiraHistoryConfig in the body, without the whole result in memory.
+    # format: ndjson (default) with a {"cursor": ...} line after every page, json or csv.
+    # cursor: resumes the stream at the page after that cursor line. An invalid cursor is a 400.
+    # ETag/Last-Modified are only sent, if all pages are known before the first byte, i.e. they come at once from
+    # the query cache or there is a single page. Pages loaded while streaming get new timestamps, so a multi-page
+    # stream has no version and If-None-Match is not answered for it.
+    try:
+        config = JiraHistoryConfig(request.json)
+        if not config.is_valid():
+            return response_json({"error": f"Invalid request body. Expected JiraHistoryConfig"}), 400
+
+        start_at = decode_cursor(request.args.get("cursor", ""))
+        output_format = request.args.get("format", "ndjson")
+        access_token = get_access_token()
+
+        jira_page = jira_client.get_issues(jql=config.get_jql(), access_token=access_token, use_cache=config.is_use_cache(), start_at=start_at, page_size=config.get_page_size())
+        version = get_history_version(config, jira_page, start_at, output_format)
+        # If-Modified-Since is not checked, the timestamp does not identify the request body
+        not_modified_response = response_not_modified(version)
+        if not_modified_response:
+            return not_modified_response
+
+        history_pages = iterate_history_pages(config, jira_page, access_token)
+        if output_format == "json":
+            response = response_json_stream(iterate_history_issues(history_pages), items_key="issues",
+                                            wrapper={"timestamp": jira_page.get_timestamp(), "total": jira_page.get_total()})
+        elif output_format == "csv":
+            response = response_csv_stream(iterate_history_issues(history_pages), get_history_columns(config), filename="history.csv")
+        else:
+            response = Response(stream_with_context(history_pages_to_ndjson(history_pages)), mimetype="application/x-ndjson")
+            response.headers["Content-Type"] = "application/x-ndjson; charset=utf-8"
+            response = compress_response(response)
+
+        if version:
+            set_version_headers(response, version, jira_page.get_timestamp())
+        response.headers["X-Total-Count"] = str(jira_page.get_total())
+        return response
+
+    except Exception as e:
+        print(e)
+        print(traceback.format_exc())
+        return response_json({"error": str(e)}), 400
+
+
+def iterate_history_pages(config: JiraHistoryConfig, jira_page, access_token: str) -> Iterator:
+    jira_history = JiraHistory(issues_fields=config.get_fields())
+    while True:
+        yield jira_page, jira_history.get_histories(jira_page.get_issues())
+        if not jira_page.has_next() or not jira_page.get_issues():
+            return
+
+        jira_page = jira_client.get_issues(jql=config.get_jql(), access_token=access_token, use_cache=config.is_use_cache(),
+                                           start_at=jira_page.get_next_start_at(), page_size=config.get_page_size())
+
+
+def history_pages_to_ndjson(history_pages: Iterator) -> Iterator[bytes]:
+    for jira_page, history_issues in history_pages:
+        for history_issue in history_issues:
+            yield encode_json(history_issue) + b"\n"
+        if jira_page.has_next():
+            # clients can resume the stream at every page boundary
+            yield encode_json({"cursor": encode_cursor(jira_page.get_next_start_at())}) + b"\n"
+
+
+def iterate_history_issues(history_pages: Iterator) -> Iterator[Dict]:
+    for _, history_issues in history_pages:
+        yield from history_issues
+
+
+def get_history_columns(config: JiraHistoryConfig) -> List[CsvColumn]:
+    # one column per field with its current value, the last entry of the history
+    columns = [CsvColumn("key"), CsvColumn("created"), CsvColumn("resolutiondate")]
+    for field_name in config.get_fields():
+        if field_name not in ["key", "created", "resolutiondate"]:
+            columns.append(CsvColumn(field_name, extract=lambda history_issue, name=field_name: get_current_value(history_issue, name)))
+    return columns
+
+
+def get_current_value(history_issue: Dict, field_name: str):
+    history = history_issue.get(field_name)
+    if not history:
+        return None
+    return next(iter(history[-1].values()))
+
+
+def encode_cursor(start_at: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"startAt": start_at}).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    if not cursor:
+        return 0
+
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["startAt"])
+    except Exception as e:
+        raise Exception(f"Invalid cursor: {cursor}", e)
+
+
+def get_history_version(config: JiraHistoryConfig, jira_page, start_at: int, output_format: str) -> str | None:
+    # The pages of the query cache are returned at once, their timestamp is the newest of all pages. Pages, which
+    # are loaded while streaming, get a new timestamp. Without all pages there is no version.
+    if jira_page.has_next():
+        return None
+    return f"history|{jira_page.get_timestamp()}|{jira_page.get_total()}|{config.get_hash()}|{start_at}|{output_format}"
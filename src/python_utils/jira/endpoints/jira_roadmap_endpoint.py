@@ -4,12 +4,12 @@ from wsgiref.util import request_uri
 
 from flask import Blueprint, request
 from python_utils.jira.jira_client import JiraClient
-from python_utils.flask.endpoint import response_json, destroy_endpoint, init_endpoint, response_cookie
+from python_utils.flask.endpoint import response_json, destroy_endpoint, init_endpoint, response_cookie, response_not_modified
 from python_utils.env import inject_environment
 from python_utils.file import lookup_file, file_exists
 from python_utils.jira.jira_security import token_required, get_access_token
 from python_utils.jira.jira_security import read_tokens, write_tokens, register_token, logout, is_logged_in
-from typing import Dict
+from typing import Dict, List
 
 
 jira_roadmap_endpoint = Blueprint('jira_roadmap_endpoint', __name__, url_prefix='/rest/jira')
@@ -33,9 +33,22 @@ def get_roadmap(project_id: str, plan_id: str, scenario_id: str):
     use_cache = request.args.get("useCache", "false").lower() in ["true", "1"]
     versions_filters = request.args.getlist("fixVersions")
 
+    if use_cache:
+        # the roadmap is neither loaded nor converted, if the client has the cached version already
+        timestamp = jira_client.get_cached_roadmap_timestamp(project_id, int(plan_id), int(scenario_id))
+        if timestamp:
+            not_modified_response = response_not_modified(get_roadmap_version(project_id, plan_id, scenario_id, versions_filters, timestamp), timestamp)
+            if not_modified_response:
+                return not_modified_response
+
     roadmap = jira_client.get_roadmap(project_id, plan_id=int(plan_id), scenario_id=int(scenario_id), fix_version_filters=versions_filters, access_token=get_access_token(), use_cache=use_cache)
 
-    return response_json(roadmap)
+    return response_json(roadmap, version=get_roadmap_version(project_id, plan_id, scenario_id, versions_filters, roadmap["timestamp"]),
+                         last_modified=roadmap["timestamp"])
+
+
+def get_roadmap_version(project_id: str, plan_id: str, scenario_id: str, versions_filters: List[str], timestamp: str) -> str:
+    return f"roadmap|{project_id}|{plan_id}|{scenario_id}|{','.join(versions_filters)}|{timestamp}"
 
 @jira_roadmap_endpoint.route('/roadmap/rank/<plan_id>/<scenario_id>/<anchor_issue_id>/<issue_id>', methods=["GET"])
 @token_required()
@@ -0,0 +1,5 @@
+from python_utils.flask.shared_endpoint import create_shared_endpoint
+from python_utils.jira.jira_security import token_required
+
+# the metrics of the global data store, for logged in jira users
+shared_endpoint = create_shared_endpoint(token_required())
@@ -181,13 +181,18 @@ class RoadmapCache:
         if not result:
             return None
 
-        return { "issues": result[0]["roadmap"], "timestamp": result[0]["timestamp"] }
+        # "timestamp" is the day the entry is valid for, "fetched" the full time it was loaded from the backend
+        return { "issues": result[0]["roadmap"], "timestamp": result[0].get("fetched", result[0]["timestamp"]) }
 
-    def add_roadmap(self, project_id: str, plan_id: int, scenario_id: int, roadmap: List[Dict[str, str]]):
+    def get_roadmap_timestamp(self, project_id: str, plan_id: int, scenario_id: int) -> str | None:
+        roadmap = self.get_roadmap(project_id, plan_id, scenario_id)
+        return roadmap["timestamp"] if roadmap else None
+
+    def add_roadmap(self, project_id: str, plan_id: int, scenario_id: int, roadmap: List[Dict[str, str]], fetched: str):
         cached_queries = Query()
         roadmap_id = self.create_roadmap_id(project_id, plan_id, scenario_id)
         with self.lock:
-            self.db.upsert({"id": roadmap_id, "timestamp": self.current_timestamp(), "roadmap": roadmap}, (cached_queries.id == roadmap_id))
+            self.db.upsert({"id": roadmap_id, "timestamp": self.current_timestamp(), "fetched": fetched, "roadmap": roadmap}, (cached_queries.id == roadmap_id))
             self.db.storage.flush()
 
     @staticmethod
@@ -290,7 +295,7 @@ class JiraClient:
 
         if not roadmap:
             roadmap = self.get_roadmap_from_jira_backend(plan_id, scenario_id, access_token)
-            self.roadmap_cache.add_roadmap(project_id, plan_id, scenario_id, roadmap["issues"])
+            self.roadmap_cache.add_roadmap(project_id, plan_id, scenario_id, roadmap["issues"], roadmap["timestamp"])
 
         unreleased_versions = self.get_unreleased_versions(project_id, access_token)
         version_ids = get_matching_version_ids(unreleased_versions, fix_version_filters)
@@ -306,6 +311,9 @@ class JiraClient:
 
         return { "issues": issues, "timestamp": roadmap["timestamp"] }
 
+    def get_cached_roadmap_timestamp(self, project_id: str, plan_id: int, scenario_id: int) -> str | None:
+        return self.roadmap_cache.get_roadmap_timestamp(project_id, plan_id, scenario_id)
+
     def change_roadmap_issue_rank(self, plan_id: int, scenario_id: int, anchor_issue_id: int, issue_id: int, access_token: str, operation="AFTER"):
         headers = {
             "Accept": "application/json",
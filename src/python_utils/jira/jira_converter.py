@@ -0,0 +1,86 @@
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from python_utils.dynamic_execution import DynamicExecution
+
+
+class JiraConverter:
+
+    def __init__(self, name: str, convert_method: Callable, batch_convert_method: Callable = None):
+        self.name = name
+        self.convert_method = convert_method
+        self.batch_convert_method = batch_convert_method
+
+    def convert(self, value, second_argument: str = None):
+        if second_argument:
+            return self.convert_method(value, second_argument)
+        return self.convert_method(value)
+
+    def convert_all(self, values: List, second_argument: str = None) -> List:
+        if self.batch_convert_method:
+            if second_argument:
+                return self.batch_convert_method(values, second_argument)
+            return self.batch_convert_method(values)
+
+        return [self.convert(value, second_argument) for value in values]
+
+    def is_batch_converter(self) -> bool:
+        return bool(self.batch_convert_method)
+
+    def __repr__(self) -> str:
+        return f"JiraConverter({self.name}, batch={self.is_batch_converter()})"
+
+
+class JiraConverterRegistry:
+
+    def __init__(self):
+        self.converters: Dict[Tuple[str, str], JiraConverter] = {}
+        self.lock = threading.Lock()
+
+    def get_converter(self, full_method_name: str, default_module_name="") -> JiraConverter:
+        converter_id = (full_method_name, default_module_name)
+        converter = self.converters.get(converter_id)
+        if converter:
+            return converter
+
+        with self.lock:
+            if converter_id not in self.converters:
+                self.converters[converter_id] = self.create_converter(full_method_name, default_module_name)
+
+            return self.converters[converter_id]
+
+    @staticmethod
+    def create_converter(full_method_name: str, default_module_name: str) -> JiraConverter:
+        convert_method = DynamicExecution.by_full_name(full_method_name, default_module_name).imported_method
+        return JiraConverter(full_method_name, convert_method, getattr(convert_method, "batch_convert_method", None))
+
+    def clear(self):
+        with self.lock:
+            self.converters.clear()
+
+
+converter_registry = JiraConverterRegistry()
+
+
+def batch_converter(batch_convert_method: Callable):
+    # Registers a method converting a whole list of values at once for a single value converter
+    def wrapper(convert_method):
+        convert_method.batch_convert_method = batch_convert_method
+        return convert_method
+
+    return wrapper
+
+
+def convert_distinct_values(values: List, convert_method: Callable, *arguments) -> List:
+    # Timelines repeat the same values. Every distinct (hashable) value is converted only once.
+    converted_values = {}
+    result = []
+    for value in values:
+        if isinstance(value, (list, dict)):
+            result.append(convert_method(value, *arguments))
+            continue
+        if value not in converted_values:
+            converted_values[value] = convert_method(value, *arguments)
+        result.append(converted_values[value])
+
+    return result
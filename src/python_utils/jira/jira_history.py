@@ -1,8 +1,9 @@
-from typing import List, Dict, Tuple
-from python_utils.dynamic_execution import DynamicExecution
-from python_utils.timestamp import now
+from typing import List, Dict, Tuple, Iterable
+from python_utils.jira.jira_converter import converter_registry, batch_converter
+from python_utils.timestamp import now, to_epoch_millis, as_epoch_millis, epoch_millis_to_date, ONE_DAY_IN_MILLIS
 import re
-from datetime import datetime, UTC, timedelta, timezone
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date
 
 JIRA_SNAPSHOT_FIELD_CONFIGURATION_PATTERN = re.compile(r"([A-Za-z0-9_.]*)\(([A-Za-z0-9_.\s]*),?\s*(([\"\'A-Za-z0-9_.\s,]*))\)")
 
@@ -12,7 +13,7 @@ class JiraHistoryField:
     def __init__(self, backup_history_field_name: str, field_access_config: str):
         self.field_convert_method_name, self.history_field_name, self.field_convert_method_second_argument = JiraField.parse_field_access_config(
             field_access_config)
-        self.field_convert_method = DynamicExecution.by_full_name(self.field_convert_method_name, __name__) if self.field_convert_method_name else None
+        self.field_converter = converter_registry.get_converter(self.field_convert_method_name, __name__) if self.field_convert_method_name else None
         if not self.history_field_name:
             self.history_field_name = backup_history_field_name
 
@@ -25,21 +26,16 @@ class JiraHistoryField:
     def extract_value(self, issue_change_history: Dict):
         history_entries = issue_change_history[self.history_field_name]
 
-        if not self.field_convert_method:
+        if not self.field_converter:
             return history_entries
 
-        for timestamp in history_entries:
-            value = history_entries[timestamp]
-            history_entries[timestamp] = self.field_convert_method.execute(self.get_convert_method_arguments(value))
+        # one converter call for the whole timeline of the field
+        converted_values = self.field_converter.convert_all(list(history_entries.values()), self.field_convert_method_second_argument)
+        for timestamp, converted_value in zip(list(history_entries), converted_values):
+            history_entries[timestamp] = converted_value
 
         return history_entries
 
-    def get_convert_method_arguments(self, value):
-        if self.field_convert_method_second_argument:
-            return value, self.field_convert_method_second_argument
-        else:
-            return [value]
-
 
 class JiraField:
 
@@ -47,7 +43,7 @@ class JiraField:
         self.field_name = field_name
         self.field_convert_method_name, self.field_property_path, self.field_convert_method_second_argument = self.parse_field_access_config(
             field_access_config)
-        self.field_convert_method = DynamicExecution.by_full_name(self.field_convert_method_name, __name__) if self.field_convert_method_name else None
+        self.field_converter = converter_registry.get_converter(self.field_convert_method_name, __name__) if self.field_convert_method_name else None
 
     def get_name(self):
         return self.field_name
@@ -57,10 +53,7 @@ class JiraField:
             return None
 
         value = self.extract_property_value(issue, self.field_property_path)
-        parameters = [value]
-        if self.field_convert_method_second_argument:
-            parameters = (value, self.field_convert_method_second_argument)
-        return self.field_convert_method.execute(parameters) if self.field_convert_method else value
+        return self.field_converter.convert(value, self.field_convert_method_second_argument) if self.field_converter else value
 
     @staticmethod
     def has_property_path(issue: Dict, property_path: str) -> bool:
@@ -183,20 +176,21 @@ class JiraHistory:
 
     @staticmethod
     def convert_dict_to_ordered_list(dict: Dict) -> List[Dict]:
-        return [{key: dict[key]} for key in sorted(dict.keys())]
+        return [{key: dict[key]} for key in sorted(dict.keys(), key=to_epoch_millis)]
 
     def get_histories(self, issues: List[Dict]):
 
         history_issues = []
 
         for issue in issues:
-            history_issue = {"key": issue["key"], "created": issue["fields"]["created"], "resolutiondate": issue["fields"]["resolutiondate"]}
+            history_issue = HistoryIssue({"key": issue["key"], "created": issue["fields"]["created"], "resolutiondate": issue["fields"]["resolutiondate"]})
             issue_change_history = self.get_change_history(issue)
 
             for field_name in self.config.get_field_names():
                 if field_name not in history_issue:
                     history_issue[field_name] = self.convert_dict_to_ordered_list(self.extract_history_values(field_name, issue, issue_change_history))
 
+            get_epoch_millis(history_issue)
             history_issues.append(history_issue)
 
         return history_issues
@@ -218,7 +212,7 @@ class JiraHistory:
         created_timestamp = JiraHistory.get_created_timestamp(issue)
 
         if "changelog" in issue and "histories" in issue["changelog"]:
-            history_entries = sorted(issue["changelog"]["histories"], key=lambda entry: entry["created"], reverse=True)
+            history_entries = sorted(issue["changelog"]["histories"], key=lambda entry: to_epoch_millis(entry["created"]), reverse=True)
             for history_entry in history_entries:
                 history_created = history_entry["created"]
                 for item in history_entry["items"]:
@@ -230,45 +224,83 @@ class JiraHistory:
         return changed
 
 
+def join_all(items_list: List[List], delimiter=" ") -> List[str]:
+    return [delimiter.join(items) for items in items_list]
+
+
+@batch_converter(join_all)
 def join(items: List, delimiter=" ") -> str:
     return delimiter.join(items)
 
 
+def split_all(texts: List[str], seperator=" ") -> List[None | List[str]]:
+    return [text.split(sep=seperator) if text else None for text in texts]
+
+
+@batch_converter(split_all)
 def split(text: str, seperator=" ") -> None | List[str]:
     if not text:
         return None
 
     return text.split(sep=seperator)
 
+class HistoryIssue(dict):
+    # A history issue of JiraHistory. The parsed timestamps are kept in an attribute, so they are not part of the JSON.
+    __slots__ = ("epoch_millis",)
+
+
+def get_epoch_millis(history_issue: Dict) -> Dict:
+    # created/resolutiondate and one list of timestamps per history property. Parsed once per HistoryIssue,
+    # plain dicts (e.g. of a request body) on every call.
+    epoch_millis = getattr(history_issue, "epoch_millis", None)
+    if epoch_millis is None:
+        epoch_millis = {"created": to_epoch_millis(history_issue["created"]),
+                        "resolutiondate": to_epoch_millis(history_issue.get("resolutiondate"))}
+        for property_name, property_value in history_issue.items():
+            if isinstance(property_value, list):
+                epoch_millis[property_name] = [to_epoch_millis(next(iter(history_entry))) for history_entry in property_value]
+        if isinstance(history_issue, HistoryIssue):
+            history_issue.epoch_millis = epoch_millis
+
+    return epoch_millis
+
+
 def create_snapshots(history_issues, timestamps, timestamp_converter=None):
+    return dict(iterate_snapshots(history_issues, timestamps, timestamp_converter))
+
+
+def iterate_snapshots(history_issues, timestamps, timestamp_converter=None, include_history=True, fields: List[str] = None):
     timestamp_converter = timestamp_converter or (lambda timestamp: timestamp)
+    issues_epoch_millis = [(issue, get_epoch_millis(issue)) for issue in history_issues]
 
-    return create_index_of_list_with_unique_keys([
-        {timestamp: [
-            create_snapshot(issue, timestamp_converter(timestamp))
-            for issue in history_issues
-            if issue['created'] <= timestamp_converter(timestamp)
-        ]}
-        for timestamp in timestamps
-    ])
+    for timestamp in timestamps:
+        converted_timestamp = as_epoch_millis(timestamp_converter(timestamp))
+        yield timestamp, [
+            create_snapshot(issue, converted_timestamp, include_history, fields, epoch_millis)
+            for issue, epoch_millis in issues_epoch_millis
+            if epoch_millis["created"] <= converted_timestamp
+        ]
 
 
-def create_snapshot(history_issue, timestamp):
+def create_snapshot(history_issue, timestamp, include_history=True, fields: List[str] = None, epoch_millis: Dict = None):
+    timestamp = as_epoch_millis(timestamp)
+    epoch_millis = epoch_millis or get_epoch_millis(history_issue)
     snapshot = {}
 
     for property_name, property_value in history_issue.items():
+        if fields is not None and property_name != "key" and property_name not in fields:
+            continue
+
         if not isinstance(property_value, list):
             snapshot[property_name] = property_value
         else:
-            property_values_before_timestamp = [
-                {"timestamp": list(history_entry.keys())[0], "value": list(history_entry.values())[0]}
-                for history_entry in property_value
-                if list(history_entry.keys())[0] <= timestamp
-            ]
-            if property_values_before_timestamp:
-                snapshot[property_name] = property_values_before_timestamp[-1]["value"]
+            # history entries are ordered by timestamp
+            entry_index = bisect_right(epoch_millis[property_name], timestamp) - 1
+            if entry_index >= 0:
+                snapshot[property_name] = next(iter(property_value[entry_index].values()))
 
-    snapshot["history"] = history_issue
+    if include_history:
+        snapshot["history"] = history_issue
 
     return snapshot
 
@@ -280,28 +312,173 @@ def create_index_of_list_with_unique_keys(array_of_objects):
     return index
 
 
+def create_cumulative_flow(history_issues, timestamps, property_name="status", done_values: List = None, wip_values: List = None,
+                           timestamp_converter=None) -> List[Dict]:
+    timestamp_converter = timestamp_converter or (lambda timestamp: timestamp)
+    done_values = set(done_values or [])
+    wip_values = set(wip_values) if wip_values is not None else None
+
+    def is_wip(value) -> bool:
+        if value is None:
+            return False
+        return value in wip_values if wip_values is not None else value not in done_values
+
+    events = create_state_events(history_issues, property_name)
+    current_values = {}
+    state_counts = {}
+    wip = 0
+    event_index = 0
+    cumulative_flow = []
+
+    for position, timestamp in enumerate(sorted(timestamps, key=lambda timestamp: as_epoch_millis(timestamp_converter(timestamp)))):
+        converted_timestamp = as_epoch_millis(timestamp_converter(timestamp))
+        throughput = 0
+
+        while event_index < len(events) and events[event_index][0] <= converted_timestamp:
+            _, _, issue_key, value = events[event_index]
+            event_index += 1
+
+            previous_value = current_values.get(issue_key)
+            current_values[issue_key] = value
+            if previous_value is not None:
+                state_counts[previous_value] -= 1
+            if value is not None:
+                state_counts[value] = state_counts.get(value, 0) + 1
+            wip += is_wip(value) - is_wip(previous_value)
+
+            # transitions before the first timestamp only define the initial state
+            if position > 0 and value in done_values and previous_value not in done_values:
+                throughput += 1
+
+        cumulative_flow.append({
+            "timestamp": timestamp,
+            "counts": {value: count for value, count in state_counts.items() if count},
+            "throughput": throughput,
+            "wip": wip
+        })
+
+    return cumulative_flow
+
+
+def create_state_events(history_issues, property_name: str) -> List[Tuple]:
+    events = []
+    for history_issue in history_issues:
+        if property_name not in history_issue:
+            continue
+
+        epoch_millis = get_epoch_millis(history_issue)
+        created = epoch_millis["created"]
+        for history_entry, timestamp in zip(history_issue[property_name], epoch_millis[property_name]):
+            value = next(iter(history_entry.values()))
+            if isinstance(value, (list, dict)):
+                continue
+            # an issue is not visible before it has been created
+            events.append((max(timestamp, created), len(events), history_issue["key"], value))
+
+    events.sort()
+    return events
+
+
 def get_leadtime(history_issues, start_state_configuration, end_state_configuration):
+    start_state = create_state_configuration_object(start_state_configuration)
+    end_state = create_state_configuration_object(end_state_configuration)
+
     return [
         {
             'key': history_issue['key'],
-            'start': find_timestamp(
-                history_issue,
-                create_state_configuration_object(start_state_configuration)['propertyName'],
-                create_state_configuration_object(start_state_configuration)['value'],
-                0
-            ),
-            'end': find_timestamp(
-                history_issue,
-                create_state_configuration_object(end_state_configuration)['propertyName'],
-                create_state_configuration_object(end_state_configuration)['value'],
-                -1
-            ),
+            'start': find_timestamp(history_issue, start_state['propertyName'], start_state['value'], 0),
+            'end': find_timestamp(history_issue, end_state['propertyName'], end_state['value'], -1),
             'issue': history_issue
         }
         for history_issue in history_issues
     ]
 
 
+def get_leadtimes(history_issues, start_state_configuration, end_state_configuration, including_weekend=True, holidays: Iterable = None) -> Dict:
+    start_state = create_state_configuration_object(start_state_configuration)
+    end_state = create_state_configuration_object(end_state_configuration)
+
+    leadtimes = []
+    for history_issue in history_issues:
+        value_indexes = {}
+        start = find_timestamp_in_index(history_issue, start_state['propertyName'], start_state['value'], 0, value_indexes)
+        end = find_timestamp_in_index(history_issue, end_state['propertyName'], end_state['value'], -1, value_indexes)
+        leadtimes.append({'key': history_issue['key'], 'start': start, 'end': end, 'leadtime': None, 'issue': history_issue})
+
+    completed_leadtimes = [leadtime for leadtime in leadtimes if leadtime['start'] and leadtime['end']]
+    days = get_lead_times_in_days([leadtime['start'] for leadtime in completed_leadtimes],
+                                  [leadtime['end'] for leadtime in completed_leadtimes],
+                                  including_weekend=including_weekend, holidays=holidays)
+    for leadtime, leadtime_in_days in zip(completed_leadtimes, days):
+        leadtime['leadtime'] = leadtime_in_days
+
+    return {
+        'issues': leadtimes,
+        'statistics': create_leadtime_statistics(days)
+    }
+
+
+def create_value_index(history_entries: List[Dict]) -> Dict:
+    value_index = {}
+    for history_entry in history_entries:
+        for timestamp, value in history_entry.items():
+            index_key = to_index_key(value)
+            if index_key is not None:
+                value_index.setdefault(index_key, []).append(timestamp)
+
+    return value_index
+
+
+def to_index_key(value):
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        # dicts are never equal to a configured state value
+        return None
+
+    return value
+
+
+def find_timestamp_in_index(history_issue, property_name, property_value, array_index, value_indexes: Dict):
+    if callable(property_value):
+        return find_timestamp_by_function(history_issue, property_name, property_value, array_index)
+
+    if property_name not in value_indexes:
+        value_indexes[property_name] = create_value_index(history_issue[property_name])
+    value_index = value_indexes[property_name]
+
+    for value in (property_value if isinstance(property_value, list) else [property_value]):
+        timestamps = value_index.get(value)
+        if timestamps:
+            return timestamps[array_index]
+
+    return None
+
+
+def create_leadtime_statistics(leadtimes: List[int]) -> Dict:
+    if not leadtimes:
+        return {'count': 0, 'mean': None, 'p50': None, 'p85': None, 'p95': None}
+
+    sorted_leadtimes = sorted(leadtimes)
+    return {
+        'count': len(sorted_leadtimes),
+        'mean': sum(sorted_leadtimes) / len(sorted_leadtimes),
+        'p50': get_percentile(sorted_leadtimes, 50),
+        'p85': get_percentile(sorted_leadtimes, 85),
+        'p95': get_percentile(sorted_leadtimes, 95)
+    }
+
+
+def get_percentile(sorted_values: List, percentile: float) -> float:
+    # linear interpolation between the closest ranks
+    position = (len(sorted_values) - 1) * percentile / 100
+    lower_index = int(position)
+    upper_index = min(lower_index + 1, len(sorted_values) - 1)
+    fraction = position - lower_index
+
+    return sorted_values[lower_index] + (sorted_values[upper_index] - sorted_values[lower_index]) * fraction
+
+
 def get_timestamp(history_issue, start_state_configuration):
     start_state = create_state_configuration_object(start_state_configuration)
     return find_timestamp(history_issue, start_state['propertyName'], start_state['value'], 0)
@@ -357,46 +534,81 @@ def get_lead_time_in_days(start: str, end: str=None, including_weekend=True) ->
     else:
         return get_lead_time_in_days_without_weekend(start, end)
 
-def get_lead_time_in_days_including_weekend(start, end=None) -> int:
+
+def get_lead_times_in_days(starts: List[str], ends: List[str] = None, including_weekend=True, holidays: Iterable = None) -> List[int]:
+    current_timestamp = to_epoch_millis(now())
+    ends = ends or [None] * len(starts)
+    holiday_calendar = create_holiday_calendar(holidays)
+
+    if including_weekend:
+        return [get_lead_time_in_days_including_weekend(start, end or current_timestamp) for start, end in zip(starts, ends)]
+    else:
+        return [get_lead_time_in_days_without_weekend(start, end or current_timestamp, holiday_calendar) for start, end in zip(starts, ends)]
+
+
+def get_lead_time_in_days_including_weekend(start: str | int, end: str | int = None) -> int:
+    if not start:
+        return -1
+
+    start_millis = as_epoch_millis(start)
+    end_millis = as_epoch_millis(end or now())
+
+    return round(abs(end_millis - start_millis) / ONE_DAY_IN_MILLIS)
+
+
+def get_lead_time_in_days_without_weekend(start: str | int, end: str | int = None, holiday_calendar: List[date] = None) -> int:
     if not start:
         return -1
 
-    one_day = 24 * 60 * 60  # Sekunden in einem Tag
     end = end or now()
+    start_millis = as_epoch_millis(start)
+    end_millis = as_epoch_millis(end)
 
-    start_date = datetime.fromisoformat(start)
-    end_date = datetime.fromisoformat(end)
+    if start_millis > end_millis:
+        start, end = end, start
+        start_millis, end_millis = end_millis, start_millis
 
-    if start_date.tzinfo is None:
-        start_date = start_date.replace(tzinfo=timezone.utc)
+    # every day starting at start (same time of day) up to end is counted. The days are the calendar days in the
+    # offset of the start timestamp.
+    day_count = (end_millis - start_millis) // ONE_DAY_IN_MILLIS + 1
 
-    if end_date.tzinfo is None:
-        end_date = end_date.replace(tzinfo=timezone.utc)
+    return count_business_days(to_local_date(start), day_count, holiday_calendar)
 
-    diff_in_seconds = abs((end_date - start_date).total_seconds())
 
-    return round(diff_in_seconds / one_day)
+def to_local_date(timestamp: str | int | datetime | date) -> date:
+    # the calendar date in the offset of the timestamp. Epoch millis and timestamps without offset are UTC.
+    if isinstance(timestamp, int):
+        return epoch_millis_to_date(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
 
+    return datetime.fromisoformat(timestamp).date()
 
-def get_lead_time_in_days_without_weekend(start, end=None) -> int:
-    if not start:
-        return -1
 
-    one_day = timedelta(days=1)
-    end = end or datetime.now(UTC).isoformat()
+def count_business_days(start_date: date, day_count: int, holiday_calendar: List[date] = None) -> int:
+    full_weeks, remaining_days = divmod(day_count, 7)
+    start_weekday = start_date.weekday()
+
+    business_days = full_weeks * 5
+    business_days += sum(1 for offset in range(remaining_days) if (start_weekday + offset) % 7 < 5)
 
-    start_date = datetime.fromisoformat(start)
-    end_date = datetime.fromisoformat(end)
+    if holiday_calendar:
+        end_date = date.fromordinal(start_date.toordinal() + day_count - 1)
+        business_days -= bisect_right(holiday_calendar, end_date) - bisect_left(holiday_calendar, start_date)
 
-    if start_date > end_date:
-        start_date, end_date = end_date, start_date
+    return business_days
 
-    total_days = 0
-    current_date = start_date
 
-    while current_date <= end_date:
-        if current_date.weekday() < 5:
-            total_days += 1
-        current_date += one_day
+def create_holiday_calendar(holidays: Iterable = None) -> List[date]:
+    # sorted, unique business days only. Holidays on a weekend are not counted anyway.
+    holiday_dates = set()
+    for holiday in holidays or []:
+        holiday_date = holiday if isinstance(holiday, date) else date.fromisoformat(str(holiday)[:10])
+        if isinstance(holiday_date, datetime):
+            holiday_date = holiday_date.date()
+        if holiday_date.weekday() < 5:
+            holiday_dates.add(holiday_date)
 
-    return total_days
\ No newline at end of file
+    return sorted(holiday_dates)
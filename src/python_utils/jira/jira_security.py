@@ -7,7 +7,14 @@ from flask import jsonify, request
 from python_utils.flask.shared import shared_dict
 from python_utils.file import file_exists
 
-authenticated_tokens = shared_dict()
+TOKEN_TIME_TO_LIVE = 14 * 24 * 60 * 60
+MAX_AUTHENTICATED_TOKENS = 10000
+
+# Unused logins expire after the ttl. The least recently used logins are dropped beyond the max size.
+# Logins survive a restart, if the global data share is started with a persistence directory.
+# Otherwise they are saved to the token file on shutdown, see jira_endpoint.
+authenticated_tokens = shared_dict(near_cache=True, ttl=TOKEN_TIME_TO_LIVE, max_size=MAX_AUTHENTICATED_TOKENS,
+                                   persistent=True, name="jira_security.authenticated_tokens")
 
 
 def token_required():
@@ -60,20 +67,21 @@ def register_token(token: str) -> str:
     return auth_id
 
 
+def are_tokens_persistent() -> bool:
+    return authenticated_tokens.is_persistent()
+
+
 def read_tokens(filename: str) -> Dict:
     if not file_exists(filename):
         return {}
 
     with open(filename, "r") as file:
         persistent_tokens = json.load(file)
-        for auth_id in persistent_tokens:
-            authenticated_tokens[auth_id] = persistent_tokens[auth_id]
+        authenticated_tokens.update(persistent_tokens)
 
 
 def write_tokens(filename: str):
-    persistent_tokens = {}
-    for auth_id in authenticated_tokens:
-        persistent_tokens[auth_id] = authenticated_tokens[auth_id]
+    persistent_tokens = authenticated_tokens.get_data()
 
     with open(filename, "w") as file:
         json.dump(persistent_tokens, file)
@@ -1,5 +1,6 @@
 import re
 from typing import List, Dict
+from python_utils.jira.jira_converter import batch_converter, convert_distinct_values
 
 SPRINT_PATTERN = r"com\.atlassian\.greenhopper\.service\.sprint\.Sprint@[A-Za-z0-9]*\[id=(\d+),.*,state=([^,]+),.*name=([^,]+),startDate=([^,]+),endDate=([^,]+),completeDate=([^,]+),activatedDate=([^,]+),.*"
 
@@ -36,6 +37,15 @@ class Sprint:
                 "complete_date": self.complete_date}
 
 
+def extract_sprint_names(sprint_objects: List) -> List:
+    return convert_distinct_values(sprint_objects, extract_sprint_name)
+
+
+def sprints_to_json(sprint_objects: List) -> List:
+    return convert_distinct_values(sprint_objects, sprint_to_json)
+
+
+@batch_converter(extract_sprint_names)
 def extract_sprint_name(sprint_object: str) -> List | str | None:
     if not sprint_object:
         return None
@@ -46,6 +56,7 @@ def extract_sprint_name(sprint_object: str) -> List | str | None:
     return Sprint(str(sprint_object)).sprint_name
 
 
+@batch_converter(sprints_to_json)
 def sprint_to_json(sprint_object: str) -> None | List[Dict[str, str]] | Dict[str, str]:
     if not sprint_object:
         return None
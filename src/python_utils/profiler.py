@@ -80,6 +80,10 @@ class ProfilerProvider:
 
         return profiler
 
+    @staticmethod
+    def is_profiling() -> bool:
+        return getattr(ProfilerProvider.STORAGE, ProfilerProvider.GLOBAL_VARIABLE_NAME, None) is not None
+
     @staticmethod
     def remove_profiler(profiler: Profiler):
         setattr(ProfilerProvider.STORAGE, ProfilerProvider.GLOBAL_VARIABLE_NAME, profiler.get_parent())
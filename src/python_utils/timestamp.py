@@ -1,6 +1,10 @@
+from functools import lru_cache
 from typing import List, Tuple
 from datetime import datetime, timedelta, date, timezone
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_DAY_IN_MILLIS = 24 * 60 * 60 * 1000
+
 def last_day_of_month(any_day):
     # The day 28 exists in every month. 4 days later, it's always next month
     next_month = any_day.replace(day=28) + datetime.timedelta(days=4)
@@ -98,4 +102,31 @@ def timestamp_to_date(timestamp_iso_format: str) -> str:
 def now() -> str:
     current_time_zone = datetime.now(timezone.utc).astimezone().tzinfo
     current_date = datetime.now(current_time_zone)
-    return current_date.isoformat()
\ No newline at end of file
+    return current_date.isoformat()
+
+
+@lru_cache(maxsize=65536)
+def to_epoch_millis(timestamp_iso_format: str) -> int | None:
+    if not timestamp_iso_format or timestamp_iso_format == "<null>":
+        return None
+
+    timestamp = datetime.fromisoformat(timestamp_iso_format)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+    return (timestamp - EPOCH) // timedelta(milliseconds=1)
+
+
+def as_epoch_millis(timestamp: str | int | datetime | date) -> int | None:
+    if timestamp is None or isinstance(timestamp, int):
+        return timestamp
+    if isinstance(timestamp, datetime):
+        return to_epoch_millis(timestamp.isoformat())
+    if isinstance(timestamp, date):
+        return to_epoch_millis(timestamp.isoformat() + "T00:00:00")
+
+    return to_epoch_millis(timestamp)
+
+
+def epoch_millis_to_date(epoch_millis: int) -> date:
+    return date.fromordinal(EPOCH.toordinal() + epoch_millis // ONE_DAY_IN_MILLIS)
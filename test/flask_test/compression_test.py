@@ -0,0 +1,71 @@
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from python_utils.flask import endpoint
+from python_utils.flask.compression import compressed_body_cache
+from python_utils.flask.endpoint import response_json, response_json_stream, response_csv
+
+ISSUES = [{"key": f"TEST-{index}", "summary": "Summary of the issue"} for index in range(200)]
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        compressed_body_cache.clear()
+        self.app = Flask(__name__)
+
+        @self.app.route("/issues")
+        def get_issues():
+            return response_json({"issues": ISSUES}, cache_key="issues|2024-01-01T00:00:00")
+
+        @self.app.route("/small")
+        def get_small():
+            return response_json({"key": "value"})
+
+        @self.app.route("/stream")
+        def get_stream():
+            return response_json_stream(iter(ISSUES), {"timestamp": "now"}, "issues", cache_key="stream|now")
+
+        @self.app.route("/csv")
+        def get_csv():
+            return response_csv("key;summary\n" * 200)
+
+        self.client = self.app.test_client()
+
+    def test_response_json(self):
+        with patch.object(endpoint, "object_to_json", side_effect=endpoint.object_to_json) as object_to_json:
+            response = self.client.get("/issues", headers={"Accept-Encoding": "gzip, deflate"})
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+            self.assertEqual(json.loads(gzip.decompress(response.get_data()))["issues"], ISSUES)
+
+            response = self.client.get("/issues", headers={"Accept-Encoding": "gzip;q=0"})
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.json["issues"], ISSUES)
+
+            self.client.get("/issues", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(object_to_json.call_count, 2)
+
+    def test_small_response(self):
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.json, {"key": "value"})
+
+    def test_response_json_stream(self):
+        for _ in range(2):
+            response = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(json.loads(gzip.decompress(response.get_data())), {"timestamp": "now", "issues": ISSUES})
+
+        self.assertIsNotNone(compressed_body_cache.get(("stream|now", "gzip")))
+
+    def test_response_csv(self):
+        response = self.client.get("/csv", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.get_data()).decode("utf-8"), "key;summary\n" * 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from python_utils.flask import endpoint
+from python_utils.flask.endpoint import response_json, response_json_stream
+
+ISSUES = [{"key": f"TEST-{index}"} for index in range(10)]
+TIMESTAMP = "2024-01-01T12:00:00"
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route("/issues")
+        def get_issues():
+            return response_json({"issues": ISSUES}, version=f"issues|{TIMESTAMP}", last_modified=TIMESTAMP)
+
+        @self.app.route("/search", methods=["POST"])
+        def post_search():
+            return response_json({"issues": ISSUES}, version=f"issues|{TIMESTAMP}", last_modified=TIMESTAMP)
+
+        @self.app.route("/stream")
+        def get_stream():
+            return response_json_stream(iter(ISSUES), version=f"stream|{TIMESTAMP}")
+
+        self.client = self.app.test_client()
+
+    def test_etag(self):
+        response = self.client.get("/issues")
+        self.assertEqual(response.status_code, 200)
+        etag, weak = response.get_etag()
+        self.assertTrue(weak)
+        self.assertIsNotNone(response.last_modified)
+
+        with patch.object(endpoint, "object_to_json", side_effect=endpoint.object_to_json) as object_to_json:
+            response = self.client.get("/issues", headers={"If-None-Match": f'W/"{etag}"'})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+            self.assertEqual(response.get_etag(), (etag, True))
+            self.assertEqual(object_to_json.call_count, 0)
+
+        response = self.client.get("/issues", headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["issues"], ISSUES)
+
+    def test_if_modified_since(self):
+        response = self.client.get("/issues", headers={"If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/issues", headers={"If-Modified-Since": "Sun, 01 Jan 2023 00:00:00 GMT"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_stream(self):
+        response = self.client.get("/stream")
+        etag, _ = response.get_etag()
+        self.assertEqual(response.json, ISSUES)
+
+        response = self.client.get("/stream", headers={"If-None-Match": f'W/"{etag}"'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_post(self):
+        response = self.client.post("/search")
+        etag, _ = response.get_etag()
+
+        # a matching If-None-Match is a failed precondition for POST, If-Modified-Since is ignored
+        response = self.client.post("/search", headers={"If-None-Match": f'W/"{etag}"'})
+        self.assertEqual(response.status_code, 412)
+
+        response = self.client.post("/search", headers={"If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import codecs
+import unittest
+from flask import Flask
+from python_utils.flask.csv_stream import iterate_csv_stream, create_columns
+from python_utils.flask.endpoint import response_csv_stream
+
+ISSUES = [{"key": f"TEST-{index}", "fields": {"summary": f"Größe; \"{index}\"", "labels": ["a", "b"]}} for index in range(1000)]
+
+
+class TestCsvStream(unittest.TestCase):
+
+    def test_columns(self):
+        columns = create_columns({"Key": "key", "Summary": "fields.summary", "Labels": "fields.labels",
+                                  "Missing": "fields.status.name", "Length": lambda issue: len(issue["key"])})
+        csv = b"".join(iterate_csv_stream(ISSUES[:1], columns, encoding="utf-8")).decode("utf-8")
+        self.assertEqual(csv, 'Key;Summary;Labels;Missing;Length\r\nTEST-0;"Größe; ""0""";"[""a"",""b""]";;6\r\n')
+
+    def test_utf16_single_bom(self):
+        chunks = list(iterate_csv_stream(iter(ISSUES), create_columns(["key", "fields.summary"]), chunk_size=1024))
+        self.assertGreater(len(chunks), 10)
+        data = b"".join(chunks)
+        self.assertEqual(data.count(codecs.BOM_UTF16), 1)
+        self.assertTrue(data.startswith(codecs.BOM_UTF16))
+        lines = data.decode("utf-16").split("\r\n")
+        self.assertEqual(lines[0], "key;fields.summary")
+        self.assertEqual(lines[1000], 'TEST-999;"Größe; ""999"""')
+
+    def test_incremental(self):
+        consumed = []
+
+        def generate_issues():
+            for issue in ISSUES:
+                consumed.append(issue)
+                yield issue
+
+        chunks = iterate_csv_stream(generate_issues(), create_columns(["key"]), chunk_size=100)
+        next(chunks)
+        self.assertLess(len(consumed), 100)
+
+    def test_response(self):
+        app = Flask(__name__)
+
+        @app.route("/issues.csv")
+        def get_issues():
+            return response_csv_stream(iter(ISSUES), create_columns(["key"]), filename="issues.csv")
+
+        response = app.test_client().get("/issues.csv")
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.headers["Content-Type"], "text/csv; charset=utf-16")
+        self.assertIn("issues.csv", response.headers["Content-Disposition"])
+        self.assertEqual(response.get_data().decode("utf-16").split("\r\n")[1], "TEST-0")
+
+
+if __name__ == '__main__':
+    unittest.main()
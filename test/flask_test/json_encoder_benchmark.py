@@ -0,0 +1,48 @@
+import random
+import time
+from python_utils.flask.json_encoder import json_encoders
+
+ISSUES = 20000
+STATUSES = ["Open", "In Progress", "In Review", "Done"]
+USERS = ["Müller", "Schröder", "alice", "bob", "charlie"]
+
+
+def create_issue(index: int) -> dict:
+    # Shape of a Jira search result with history fields
+    created = f"2024-0{1 + index % 9}-1{index % 10}T08:00:00.000+0100"
+    return {
+        "id": str(10000 + index),
+        "key": f"PROJ-{index}",
+        "self": f"https://jira.example.com/rest/api/2/issue/{10000 + index}",
+        "fields": {
+            "summary": f"Umsetzung der Anforderung {index} für das Release",
+            "description": "Lorem ipsum dolor sit amet, consetetur sadipscing elitr. " * 5,
+            "created": created,
+            "updated": created,
+            "resolutiondate": None if index % 3 else created,
+            "status": {"name": random.choice(STATUSES), "id": str(index % 4), "statusCategory": {"key": "indeterminate"}},
+            "assignee": {"name": random.choice(USERS), "displayName": random.choice(USERS), "active": True},
+            "labels": ["backend", "release-24", f"team-{index % 7}"],
+            "components": [{"name": "api", "id": "100"}, {"name": "ui", "id": "101"}],
+            "customfield_10002": float(index % 13),
+            "customfield_10020": [f"com.atlassian.greenhopper.service.sprint.Sprint@1[id={index % 40},name=Sprint {index % 40}]"],
+        },
+        "status": [{created: "Open"}, {f"2024-10-0{1 + index % 9}T10:00:00.000+0100": random.choice(STATUSES)}],
+        "assignee": [{created: None}, {f"2024-10-0{1 + index % 9}T10:00:00.000+0100": random.choice(USERS)}],
+    }
+
+
+def measure(name: str, encode, payload) -> float:
+    start_time = time.perf_counter()
+    body = encode(payload)
+    duration = time.perf_counter() - start_time
+    print(f"{name:<30} {duration * 1000:>8.0f} ms {len(body) / 1024 / 1024:>8.1f} MB")
+    return duration
+
+
+if __name__ == '__main__':
+    random.seed(1)
+    payload = {"timestamp": "2024-10-19T12:00:00", "issues": [create_issue(index) for index in range(ISSUES)]}
+    for name, encoder in json_encoders.items():
+        measure(f"[{name}] pretty", lambda some_object: encoder.encode(some_object, pretty=True), payload)
+        measure(f"[{name}] compact", lambda some_object: encoder.encode(some_object), payload)
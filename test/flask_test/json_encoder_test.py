@@ -0,0 +1,32 @@
+import json
+import unittest
+from flask import Flask
+from python_utils.flask.endpoint import response_json
+from python_utils.flask.json_encoder import json_encoders
+
+
+class TestJsonEncoder(unittest.TestCase):
+
+    def test_encoders(self):
+        some_object = {"b": [1, 2.5, None, True], "a": "Größe", "3": {"nested": "value"}, "big": 2 ** 70}
+        for encoder in json_encoders.values():
+            compact = encoder.encode(some_object)
+            pretty = encoder.encode(some_object, pretty=True)
+            self.assertNotIn(b"\n", compact)
+            self.assertIn("Größe".encode("utf-8"), compact)
+            self.assertEqual(json.loads(compact), json.loads(pretty))
+            self.assertEqual(json.loads(compact)["3"], {"nested": "value"})
+            self.assertLess(pretty.index(b'"3"'), pretty.index(b'"a"'))
+            self.assertEqual(json.loads(encoder.encode({1: "one"})), {"1": "one"})
+
+    def test_response_json(self):
+        app = Flask(__name__)
+        with app.test_request_context("/?pretty=1"):
+            self.assertIn(b"\n", response_json({"key": "value"}).get_data())
+        with app.test_request_context("/"):
+            self.assertEqual(response_json({"key": "value"}).get_data(), b'{"key":"value"}')
+            self.assertIn(b"\n", response_json({"key": "value"}, pretty=True).get_data())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import unittest
+from flask import Flask
+from python_utils.flask.endpoint import response_json_stream, iterate_json_stream
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def test_iterate_json_stream(self):
+        self.assertEqual(b"".join(iterate_json_stream(iter([]))), b"[]")
+        self.assertEqual(json.loads(b"".join(iterate_json_stream(range(3)))), [0, 1, 2])
+        self.assertEqual(json.loads(b"".join(iterate_json_stream([], wrapper={}, items_key="issues"))), {"issues": []})
+
+        wrapper = {"timestamp": "2024-01-01T00:00:00", "issues": "replaced"}
+        chunks = list(iterate_json_stream(({"key": f"TEST-{index}"} for index in range(1000)), wrapper, "issues", chunk_size=1024))
+        self.assertGreater(len(chunks), 10)
+        result = json.loads(b"".join(chunks))
+        self.assertEqual(result["timestamp"], "2024-01-01T00:00:00")
+        self.assertEqual([issue["key"] for issue in result["issues"]], [f"TEST-{index}" for index in range(1000)])
+
+    def test_response_json_stream(self):
+        app = Flask(__name__)
+
+        @app.route("/issues")
+        def get_issues():
+            return response_json_stream(({"key": f"TEST-{index}"} for index in range(3)), {"timestamp": "now"}, "issues")
+
+        response = app.test_client().get("/issues")
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.json, {"timestamp": "now", "issues": [{"key": "TEST-0"}, {"key": "TEST-1"}, {"key": "TEST-2"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from flask import Flask, request
+from python_utils.flask.cache import init_cache, cache, cached_response, invalidate_responses, invalidates_responses, \
+    get_tag_cache, get_tag_key
+from python_utils.flask.endpoint import response_json
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_cache(self.app)
+        with self.app.app_context():
+            cache.clear()
+        self.calls = 0
+
+        @self.app.route("/issues", methods=["GET", "POST"])
+        @cached_response(ttl=300, tags=["issues"])
+        def get_issues():
+            self.calls += 1
+            time.sleep(float(request.args.get("sleep", 0)))
+            return response_json({"calls": self.calls})
+
+        @self.app.route("/expired")
+        @cached_response(ttl=0)
+        def get_expired():
+            self.calls += 1
+            return response_json({"calls": self.calls})
+
+        @self.app.route("/issues", methods=["DELETE"])
+        @invalidates_responses("issues")
+        def delete_issues():
+            return response_json({})
+
+        self.client = self.app.test_client()
+
+    def test_key(self):
+        self.assertEqual(self.client.get("/issues?a=1&b=2").json, {"calls": 1})
+        self.assertEqual(self.client.get("/issues?b=2&a=1").json, {"calls": 1})
+        self.assertEqual(self.client.get("/issues?a=2").json, {"calls": 2})
+        self.assertEqual(self.client.get("/issues", headers={"Authorization": "other"}).json, {"calls": 3})
+        self.assertEqual(self.client.post("/issues", json={"jql": "a", "size": 1}).json, {"calls": 4})
+        self.assertEqual(self.client.post("/issues", json={"size": 1, "jql": "a"}).json, {"calls": 4})
+        self.assertEqual(self.client.post("/issues", json={"jql": "b"}).json, {"calls": 5})
+
+    def test_invalidation(self):
+        self.client.get("/issues")
+        self.client.delete("/issues")
+        self.assertEqual(self.client.get("/issues").json, {"calls": 2})
+        with self.app.app_context():
+            invalidate_responses("get_issues")
+        self.assertEqual(self.client.get("/issues").json, {"calls": 3})
+
+    def test_tags_not_evicted(self):
+        init_cache(self.app, {"CACHE_THRESHOLD": 2})
+        with self.app.app_context():
+            invalidate_responses("issues")
+            for index in range(10):
+                cache.set(f"key{index}", index)
+            self.assertIsNotNone(get_tag_cache().get(get_tag_key("issues")))
+
+    def test_expired(self):
+        self.assertEqual(self.client.get("/expired").json, {"calls": 1})
+        self.assertEqual(self.client.get("/expired").json, {"calls": 2})
+
+    def test_stampede(self):
+        responses = []
+
+        def get():
+            responses.append(self.app.test_client().get("/issues?sleep=0.2").json)
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(responses, [{"calls": 1}] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import time
+import unittest
+from flask import Flask
+from python_utils.flask.cache import init_cache, cache, get_cache_statistics, get_tag_cache, TIERED_CACHE_TYPE
+from python_utils.flask.tiered_cache import TieredCache, LocalCacheTier
+from flask_caching.backends.filesystemcache import FileSystemCache
+
+
+class TestTieredCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_directory.cleanup()
+
+    def create_worker_cache(self, local_timeout: int = 5) -> TieredCache:
+        return TieredCache(FileSystemCache(self.cache_directory.name), local_timeout=local_timeout)
+
+    def test_shared_between_workers(self):
+        worker1 = self.create_worker_cache()
+        worker2 = self.create_worker_cache()
+        worker1.set("key", {"value": 1})
+        self.assertEqual(worker2.get("key"), {"value": 1})
+        self.assertEqual(worker2.get("key"), {"value": 1})
+        self.assertIsNone(worker2.get("missing"))
+
+        statistics = worker2.get_statistics()
+        self.assertEqual(statistics["local"]["hits"], 1)
+        self.assertEqual(statistics["shared"], {"hits": 1, "misses": 1, "hitRatio": 0.5})
+
+        self.assertTrue(worker1.add("lock", True))
+        self.assertFalse(worker2.add("lock", True))
+        worker2.delete("lock")
+        self.assertTrue(worker1.add("lock", True))
+
+    def test_local_timeout(self):
+        worker1 = self.create_worker_cache(local_timeout=0.1)
+        worker2 = self.create_worker_cache(local_timeout=0.1)
+        worker1.set("key", 1)
+        self.assertEqual(worker2.get("key"), 1)
+        worker1.set("key", 2)
+        self.assertEqual(worker2.get("key"), 1)
+        time.sleep(0.2)
+        self.assertEqual(worker2.get("key"), 2)
+
+    def test_size_aware_eviction(self):
+        local_tier = LocalCacheTier(max_size=2500, timeout=60)
+        local_tier.set("small", "x", 0)
+        local_tier.set("large1", "x" * 1000, 0)
+        local_tier.set("large2", "x" * 1000, 0)
+        local_tier.get("small")
+        local_tier.set("large3", "x" * 1000, 0)
+        local_tier.set("too_large", "x" * 3000, 0)
+
+        self.assertEqual(list(local_tier.entries), ["large2", "small", "large3"])
+        self.assertLessEqual(local_tier.size, 2500)
+        self.assertEqual(local_tier.get_statistics()["evictions"], 1)
+
+    def test_init_cache(self):
+        app = Flask(__name__)
+        app.config["CACHE_TYPE"] = TIERED_CACHE_TYPE
+        tag_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(tag_directory.cleanup)
+        init_cache(app, {"CACHE_DIR": self.cache_directory.name, "CACHE_TAG_DIR": tag_directory.name, "CACHE_LOCAL_MAX_SIZE": 1024})
+        with app.app_context():
+            self.assertIsInstance(cache.cache, TieredCache)
+            self.assertEqual(cache.cache.local_tier.max_size, 1024)
+            cache.set("key", "value")
+            self.assertEqual(cache.get("key"), "value")
+            self.assertEqual(get_cache_statistics()["local"]["hits"], 1)
+            # the tag generations are stored next to the shared tier
+            self.assertIsInstance(get_tag_cache(), FileSystemCache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import gzip
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from python_utils.jira.jira_client import JiraClient
+import httpx
+from python_utils.jira.async_jira_client import AsyncJiraClient
+
+ISSUES = [{"key": f"TEST-{index}", "fields": {}} for index in range(25)]
+SPRINTS = [{"id": index, "name": f"Sprint {index}", "activatedDate": f"2024-01-{10 + index}"} for index in range(5)]
+VERSIONS = [{"id": 1, "name": "Release 1", "released": False}, {"id": 2, "name": "Release 0", "released": True}]
+ROADMAP = [{"id": index, "issueKey": index, "values": {"summary": f"Issue {index}", "lexoRank": str(9 - index), "fixVersions": ["1"],
+                                                        "type": "Story", "status": "Open"}} for index in range(3)]
+
+
+class JiraStandIn(BaseHTTPRequestHandler):
+    # A local stand-in for the Jira REST api. HTTP/1.1 keeps the connections alive.
+    protocol_version = "HTTP/1.1"
+    requests = []
+    connections = set()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/rest/api/2/search":
+            start_at, max_results = int(params["startAt"]), int(params["maxResults"])
+            self.send_json({"startAt": start_at, "total": len(ISSUES), "issues": ISSUES[start_at:start_at + max_results]})
+        elif url.path == "/rest/agile/1.0/board":
+            self.send_json({"values": [{"id": 2, "name": "Team A"}, {"id": 1, "name": "Team A Kanban"}, {"id": 3, "name": "Other"}], "isLast": True})
+        elif url.path.startswith("/rest/agile/1.0/board/"):
+            start_at = int(params["startAt"])
+            self.send_json({"values": SPRINTS[start_at:start_at + 2], "isLast": start_at + 2 >= len(SPRINTS)}, chunked=True)
+        elif url.path == "/rest/api/2/project/TEST/versions":
+            self.send_json(VERSIONS)
+        elif url.path == "/rest/api/2/project/MOVED/versions":
+            self.send_response(301)
+            self.send_header("Location", "/rest/api/2/project/TEST/versions")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_json({"issues": ROADMAP}, compress=True)
+
+    def send_json(self, some_object, status=200, chunked=False, compress=False):
+        JiraStandIn.requests.append(self.path)
+        JiraStandIn.connections.add(self.client_address)
+        body = json.dumps(some_object).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for index in range(0, len(body), 20):
+                chunk = body[index:index + 20]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAsyncJiraClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), JiraStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.cache_directory = tempfile.TemporaryDirectory()
+        self.jira_client = JiraClient(hostname=f"http://127.0.0.1:{self.server.server_address[1]}", cache_directory=self.cache_directory.name)
+        JiraStandIn.requests = []
+        JiraStandIn.connections = set()
+
+    def tearDown(self):
+        self.jira_client.close()
+        self.jira_client.roadmap_cache.close()
+        self.cache_directory.cleanup()
+
+    def run_client(self, run, max_connections=10):
+        async def run_and_close():
+            client = AsyncJiraClient(self.jira_client, max_connections=max_connections)
+            try:
+                return await run(client)
+            finally:
+                await client.close()
+
+        return asyncio.run(run_and_close())
+
+    def test_paginate(self):
+        issues, timestamp = self.run_client(lambda client: client.paginate("project = TEST", "token", use_cache=True, page_size=10), max_connections=2)
+        self.assertEqual(issues, ISSUES)
+        self.assertTrue(timestamp)
+        self.assertEqual(len(JiraStandIn.requests), 3)
+        self.assertLessEqual(len(JiraStandIn.connections), 2)
+        # all fields, like the search of the JiraClient
+        self.assertTrue(all(parse_qs(urlsplit(path).query)["fields"] == ["*all"] for path in JiraStandIn.requests))
+
+        issues, _ = self.run_client(lambda client: client.paginate("project = TEST", "token", use_cache=True, page_size=10))
+        self.assertEqual(issues, ISSUES)
+        self.assertEqual(len(JiraStandIn.requests), 3)
+
+    def test_get_sprints_for_project(self):
+        sprints = self.run_client(lambda client: client.get_sprints_for_project("TEST", "Team A", "2024-01-12", "user:::password"))
+        self.assertEqual([sprint["id"] for sprint in sprints], [2, 3, 4])
+        self.assertEqual(self.jira_client.project_cache.get_sprints("TEST", "Team A", "2024-01-12"), sprints)
+
+    def test_get_roadmap(self):
+        roadmap = self.run_client(lambda client: client.get_roadmap("TEST", 1, 2, ["Release"], "token"))
+        self.assertEqual([issue["key"] for issue in roadmap["issues"]], ["TEST-2", "TEST-1", "TEST-0"])
+        # the cached version is the full fetch time, not only the day
+        self.assertEqual(self.jira_client.get_cached_roadmap_timestamp("TEST", 1, 2), roadmap["timestamp"])
+
+    def test_redirect(self):
+        versions = self.run_client(lambda client: client.get_versions("MOVED", "token"))
+        self.assertEqual(versions, VERSIONS)
+
+    def test_error(self):
+        with self.assertRaises(Exception):
+            self.run_client(lambda client: client.get_versions("OTHER", "token"))
+
+    def test_connect_timeout(self):
+        # the TLS handshake is never answered
+        with socket.socket() as silent_socket:
+            silent_socket.bind(("127.0.0.1", 0))
+            silent_socket.listen()
+            self.jira_client.hostname = f"https://127.0.0.1:{silent_socket.getsockname()[1]}"
+
+            async def get_versions():
+                client = AsyncJiraClient(self.jira_client, timeout=0.5)
+                try:
+                    return await client.get_versions("TEST", "token")
+                finally:
+                    await client.close()
+
+            with self.assertRaises(httpx.TimeoutException):
+                asyncio.run(get_versions())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+from python_utils.jira.jira_converter import converter_registry
+from python_utils.jira.jira_history import JiraHistoryConfig, JiraHistory
+
+split_converter = converter_registry.get_converter("split", "python_utils.jira.jira_history")
+assert split_converter is converter_registry.get_converter("split", "python_utils.jira.jira_history")
+assert split_converter.is_batch_converter()
+assert split_converter.convert_all(["a b", None, "c,d"]) == [["a", "b"], None, ["c,d"]]
+assert split_converter.convert_all(["a b", "c,d"], ",") == [["a b"], ["c", "d"]]
+assert split_converter.convert("a b") == ["a", "b"]
+
+sprint = "com.atlassian.greenhopper.service.sprint.Sprint@1a2b[id=12,rapidViewId=3,state=CLOSED,name=Sprint 1,startDate=2024-01-01,endDate=2024-01-14,completeDate=2024-01-14,activatedDate=2024-01-01,sequence=12,goal=]"
+sprint_converter = converter_registry.get_converter("python_utils.jira.jira_sprint.extract_sprint_name")
+assert sprint_converter.convert_all([sprint, None, sprint]) == ["Sprint 1", None, "Sprint 1"]
+
+config = JiraHistoryConfig({"labels": "split(fields.labels)/split(labels)"})
+assert config.get_field("labels").field_converter is config.get_history_field("labels").field_converter
+
+issue = {"key": "TEST-1", "fields": {"created": "2024-01-01T08:00:00.000+0000", "resolutiondate": None, "labels": "b c"},
+         "changelog": {"histories": [{"created": "2024-01-02T08:00:00.000+0000",
+                                      "items": [{"field": "labels", "fromString": "a", "toString": "b c"}]}]}}
+history_issue = JiraHistory({"labels": "split(fields.labels)/split(labels)"}).get_histories([issue])[0]
+assert history_issue["labels"] == [{"2024-01-01T08:00:00.000+0000": ["a"]}, {"2024-01-02T08:00:00.000+0000": ["b", "c"]}]
+# the parsed timestamps are not part of the JSON of a history issue
+assert sorted(history_issue.keys()) == ["created", "key", "labels", "resolutiondate"]
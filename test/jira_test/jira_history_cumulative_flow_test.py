@@ -0,0 +1,26 @@
+from python_utils.jira.jira_history import create_cumulative_flow, create_snapshots
+
+history_issues = [
+    {"key": "TEST-1", "created": "2024-01-01T08:00:00",
+     "status": [{"2024-01-01T08:00:00": "Open"}, {"2024-01-02T08:00:00": "In Progress"}, {"2024-01-04T08:00:00": "Done"}]},
+    {"key": "TEST-2", "created": "2024-01-02T09:00:00",
+     "status": [{"2024-01-02T09:00:00": "Open"}, {"2024-01-03T08:00:00": "In Progress"}]},
+    {"key": "TEST-3", "created": "2024-01-03T08:00:00",
+     "status": [{"2024-01-03T08:00:00": "Open"}, {"2024-01-03T09:00:00": "Done"}, {"2024-01-05T08:00:00": "In Progress"}]},
+]
+
+timestamps = ["2024-01-01T23:59:59", "2024-01-02T23:59:59", "2024-01-03T23:59:59", "2024-01-04T23:59:59", "2024-01-05T23:59:59"]
+cumulative_flow = create_cumulative_flow(history_issues, timestamps, "status", done_values=["Done"])
+
+snapshots = create_snapshots(history_issues, timestamps)
+for day in cumulative_flow:
+    expected_counts = {}
+    for snapshot in snapshots[day["timestamp"]]:
+        expected_counts[snapshot["status"]] = expected_counts.get(snapshot["status"], 0) + 1
+    assert day["counts"] == expected_counts, (day, expected_counts)
+
+assert [day["throughput"] for day in cumulative_flow] == [0, 0, 1, 1, 0]
+assert [day["wip"] for day in cumulative_flow] == [1, 2, 2, 1, 2]
+
+cumulative_flow = create_cumulative_flow(history_issues, timestamps, "status", done_values=["Done"], wip_values=["In Progress"])
+assert [day["wip"] for day in cumulative_flow] == [0, 1, 2, 1, 2]
@@ -1,4 +1,18 @@
 from python_utils.jira.jira_history import get_lead_time_in_days
 
 print(get_lead_time_in_days("2024-01-01"))
-print(get_lead_time_in_days("2024-01-01", "2024-03-01"))
\ No newline at end of file
+print(get_lead_time_in_days("2024-01-01", "2024-03-01"))
+
+from python_utils.jira.jira_history import get_lead_times_in_days
+
+# 2024-01-01 is a monday
+assert get_lead_time_in_days("2024-01-01T10:00:00", "2024-01-14T10:00:00", including_weekend=False) == 10
+assert get_lead_times_in_days(["2024-01-01T10:00:00", "2024-01-06T10:00:00"], ["2024-01-14T10:00:00", "2024-01-07T10:00:00"],
+                              including_weekend=False) == [10, 0]
+assert get_lead_times_in_days(["2024-01-01T10:00:00"], ["2024-01-14T10:00:00"], including_weekend=False,
+                              holidays=["2024-01-01", "2024-01-06", "2024-01-10"]) == [8]
+assert get_lead_times_in_days(["2024-01-01T10:00:00"], ["2024-01-14T10:00:00"]) == [13]
+
+# the days are counted in the offset of the start timestamp: monday 00:30 CET is sunday in UTC
+assert get_lead_time_in_days("2024-01-01T00:30:00.000+0100", "2024-01-05T10:00:00.000+0100", including_weekend=False) == 5
+assert get_lead_time_in_days("2024-01-05T10:00:00.000+0100", "2024-01-01T00:30:00.000+0100", including_weekend=False) == 5
@@ -0,0 +1,35 @@
+from python_utils.jira.jira_history import get_leadtime, get_leadtimes
+
+history_issues = [
+    {"key": "TEST-1", "created": "2024-01-01T08:00:00",
+     "status": [{"2024-01-01T08:00:00": "Open"}, {"2024-01-02T08:00:00": "In Progress"}, {"2024-01-05T08:00:00": "Done"},
+                {"2024-01-06T08:00:00": "In Progress"}, {"2024-01-11T08:00:00": "Done"}]},
+    {"key": "TEST-2", "created": "2024-01-01T08:00:00",
+     "status": [{"2024-01-01T08:00:00": "Open"}, {"2024-01-03T08:00:00": "Review"}, {"2024-01-04T08:00:00": "Closed"}]},
+    {"key": "TEST-3", "created": "2024-01-01T08:00:00",
+     "status": [{"2024-01-01T08:00:00": "Open"}]},
+]
+
+start_state = {"status": ["In Progress", "Review"]}
+end_state = {"status": ["Done", "Closed"]}
+
+result = get_leadtimes(history_issues, start_state, end_state)
+issues = result["issues"]
+
+for leadtime, expected in zip(issues, get_leadtime(history_issues, start_state, end_state)):
+    assert leadtime["start"] == expected["start"]
+    assert leadtime["end"] == expected["end"]
+
+assert issues[0]["start"] == "2024-01-02T08:00:00"
+assert issues[0]["end"] == "2024-01-11T08:00:00"
+assert issues[0]["leadtime"] == 9
+assert issues[1]["leadtime"] == 1
+assert issues[2]["leadtime"] is None
+
+statistics = result["statistics"]
+assert statistics["count"] == 2
+assert statistics["mean"] == 5
+assert statistics["p50"] == 5
+assert statistics["p95"] == 8.6
+
+assert get_leadtimes([], start_state, end_state)["statistics"]["mean"] is None
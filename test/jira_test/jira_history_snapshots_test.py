@@ -0,0 +1,36 @@
+from types import GeneratorType
+from python_utils.jira.jira_history import create_snapshots, iterate_snapshots
+
+history_issues = [
+    {"key": "TEST-1", "created": "2024-01-01T08:00:00", "summary": "First",
+     "status": [{"2024-01-01T08:00:00": "Open"}, {"2024-01-02T08:00:00": "In Progress"}],
+     "assignee": [{"2024-01-01T08:00:00": "alice"}]},
+    {"key": "TEST-2", "created": "2024-01-02T09:00:00", "summary": "Second",
+     "status": [{"2024-01-02T09:00:00": "Open"}],
+     "assignee": [{"2024-01-02T09:00:00": None}]},
+]
+
+timestamps = ["2024-01-01T23:59:59", "2024-01-02T23:59:59"]
+
+snapshots = create_snapshots(history_issues, timestamps)
+assert [snapshot["key"] for snapshot in snapshots["2024-01-01T23:59:59"]] == ["TEST-1"]
+assert snapshots["2024-01-02T23:59:59"][0]["status"] == "In Progress"
+assert snapshots["2024-01-02T23:59:59"][1]["assignee"] is None
+assert snapshots["2024-01-02T23:59:59"][1]["history"] is history_issues[1]
+
+snapshot_iterator = iterate_snapshots(history_issues, timestamps, include_history=False, fields=["status"])
+assert isinstance(snapshot_iterator, GeneratorType)
+
+timestamp, first_snapshots = next(snapshot_iterator)
+assert timestamp == "2024-01-01T23:59:59"
+assert first_snapshots == [{"key": "TEST-1", "status": "Open"}]
+
+timestamp, second_snapshots = next(snapshot_iterator)
+assert second_snapshots == [{"key": "TEST-1", "status": "In Progress"}, {"key": "TEST-2", "status": "Open"}]
+
+# Jira timestamps with different UTC offsets are compared by their point in time
+offset_issues = [{"key": "TEST-3", "created": "2024-01-02T00:30:00.000+0100",
+                  "status": [{"2024-01-02T00:30:00.000+0100": "Open"}, {"2024-01-01T23:45:00.000+0000": "In Progress"}]}]
+offset_snapshots = create_snapshots(offset_issues, ["2024-01-01T23:40:00", "2024-01-01T23:59:59"])
+assert offset_snapshots["2024-01-01T23:40:00"][0]["status"] == "Open"
+assert offset_snapshots["2024-01-01T23:59:59"][0]["status"] == "In Progress"
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask
+
+os.environ.setdefault("JIRA_HOSTNAME", "http://localhost")
+os.environ.setdefault("CACHE_DIRECTORY", tempfile.mkdtemp())
+os.environ.setdefault("TEST_MODE", "true")
+
+from python_utils.jira.jira_client import JiraPageResult
+from python_utils.jira.endpoints import jira_history_endpoint
+from python_utils.jira.endpoints.jira_history_endpoint import encode_cursor
+
+TIMESTAMP = "2024-01-01T12:00:00"
+ISSUES = [{"key": f"TEST-{index}", "fields": {"created": "2024-01-01T08:00:00.000+0000", "resolutiondate": None}} for index in range(4)]
+BODY = {"jql": "project = TEST", "useCache": True, "pageSize": 2, "fields": {}}
+
+
+class TestJiraHistoryStream(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(jira_history_endpoint.jira_history_endpoint)
+        self.client = self.app.test_client()
+        self.pages = {0: JiraPageResult(0, 4, TIMESTAMP, ISSUES[0:2]), 2: JiraPageResult(2, 4, TIMESTAMP, ISSUES[2:4])}
+        self.requested_pages = []
+
+        def get_issues(start_at: int, **kwargs):
+            self.requested_pages.append(start_at)
+            return self.pages[start_at]
+
+        self.patches = [patch.object(jira_history_endpoint.jira_client, "get_issues", side_effect=get_issues),
+                        patch("python_utils.jira.jira_security.is_logged_in", return_value=True),
+                        patch.object(jira_history_endpoint, "get_access_token", return_value="token")]
+        for started_patch in self.patches:
+            started_patch.start()
+
+    def tearDown(self):
+        for started_patch in self.patches:
+            started_patch.stop()
+
+    def post_stream(self, query: str = "", headers=None, body=None):
+        response = self.client.post(f"/rest/jira/history/stream{query}", json=body or BODY, headers=headers)
+        response.get_data()
+        return response
+
+    def test_ndjson(self):
+        response = self.post_stream()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Total-Count"], "4")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line.get("key") for line in lines], ["TEST-0", "TEST-1", None, "TEST-2", "TEST-3"])
+        # a cursor after every page with a next page
+        self.assertEqual(lines[2], {"cursor": encode_cursor(2)})
+        self.assertEqual(self.requested_pages, [0, 2])
+
+    def test_cursor(self):
+        lines = [json.loads(line) for line in self.post_stream().get_data(as_text=True).splitlines()]
+        cursor = lines[2]["cursor"]
+
+        self.requested_pages = []
+        response = self.post_stream(f"?cursor={cursor}")
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line["key"] for line in lines], ["TEST-2", "TEST-3"])
+        self.assertEqual(self.requested_pages, [2])
+
+    def test_invalid_cursor(self):
+        response = self.post_stream("?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid cursor", response.json["error"])
+
+    def test_json(self):
+        response = self.post_stream("?format=json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["total"], 4)
+        self.assertEqual(response.json["timestamp"], TIMESTAMP)
+        self.assertEqual([issue["key"] for issue in response.json["issues"]], ["TEST-0", "TEST-1", "TEST-2", "TEST-3"])
+
+    def test_csv(self):
+        response = self.post_stream("?format=csv")
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(response.get_data().decode("utf-16")), delimiter=";"))
+        self.assertEqual(rows[0], ["key", "created", "resolutiondate"])
+        self.assertEqual([row[0] for row in rows[1:]], ["TEST-0", "TEST-1", "TEST-2", "TEST-3"])
+
+    def test_conditional(self):
+        # no version, while the following pages are not loaded yet
+        self.assertIsNone(self.post_stream().headers.get("ETag"))
+
+        # the query cache returns all pages at once
+        self.pages[0] = JiraPageResult(0, 4, TIMESTAMP, ISSUES)
+        etag = self.post_stream().headers["ETag"]
+        self.assertEqual(self.post_stream(headers={"If-None-Match": etag}).status_code, 412)
+        self.assertEqual(self.post_stream("?format=json", headers={"If-None-Match": etag}).status_code, 200)
+        self.assertEqual(self.post_stream(body={**BODY, "jql": "project = OTHER"}, headers={"If-None-Match": etag}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
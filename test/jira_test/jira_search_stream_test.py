@@ -0,0 +1,73 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask
+
+os.environ.setdefault("JIRA_HOSTNAME", "http://localhost")
+os.environ.setdefault("CACHE_DIRECTORY", tempfile.mkdtemp())
+os.environ.setdefault("TEST_MODE", "true")
+
+from python_utils.jira.jira_client import JiraPageResult
+from python_utils.jira.endpoints import jira_endpoint
+
+TIMESTAMP = "2024-01-01T12:00:00"
+ISSUES = [{"key": f"TEST-{index}", "fields": {"summary": f"Issue {index}"}} for index in range(4)]
+BODY = {"jql": "project = TEST", "useCache": False, "pageSize": 2}
+
+
+class TestJiraSearchStream(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(jira_endpoint.jira_endpoint)
+        self.client = self.app.test_client()
+        self.pages = {0: JiraPageResult(0, 4, TIMESTAMP, ISSUES[0:2]), 2: JiraPageResult(2, 4, TIMESTAMP, ISSUES[2:4])}
+        self.requested_pages = []
+
+        def get_issues(start_at: int = 0, **kwargs):
+            self.requested_pages.append(start_at)
+            return self.pages[start_at]
+
+        self.patches = [patch.object(jira_endpoint.jira_client, "get_issues", side_effect=get_issues),
+                        patch("python_utils.jira.jira_security.is_logged_in", return_value=True),
+                        patch.object(jira_endpoint, "get_access_token", return_value="token")]
+        for started_patch in self.patches:
+            started_patch.start()
+
+    def tearDown(self):
+        for started_patch in self.patches:
+            started_patch.stop()
+
+    def test_csv_page_by_page(self):
+        with patch.object(jira_endpoint.jira_client, "paginate") as paginate:
+            response = self.client.post("/rest/jira/search?format=csv", json=BODY)
+            self.assertEqual(response.status_code, 200)
+            paginate.assert_not_called()
+        # no version, while the following pages are not loaded yet
+        self.assertIsNone(response.headers.get("ETag"))
+
+        rows = list(csv.reader(io.StringIO(response.get_data().decode("utf-16")), delimiter=";"))
+        self.assertEqual([row[0] for row in rows[1:]], ["TEST-0", "TEST-1", "TEST-2", "TEST-3"])
+        self.assertEqual(self.requested_pages, [0, 2])
+
+    def test_iterate_search_issues(self):
+        config = jira_endpoint.JiraSearchConfig(BODY)
+        issues = jira_endpoint.iterate_search_issues(config, self.pages[0], "token", "")
+        self.assertEqual([next(issues)["key"], next(issues)["key"]], ["TEST-0", "TEST-1"])
+        self.assertEqual(self.requested_pages, [])
+        self.assertEqual([issue["key"] for issue in issues], ["TEST-2", "TEST-3"])
+        self.assertEqual(self.requested_pages, [2])
+
+    def test_csv_version(self):
+        # the query cache returns all pages at once
+        self.pages[0] = JiraPageResult(0, 4, TIMESTAMP, ISSUES)
+        response = self.client.post("/rest/jira/search?format=csv", json=BODY)
+        response.get_data()
+        self.assertIsNotNone(response.headers.get("ETag"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,19 @@
+import os
+import socket
+import stat
+import time
 import unittest
 from unittest.mock import MagicMock
-from python_utils.flask.shared import SharedDataProxyDict
+from python_utils.flask.shared import SharedDataProxyDict, SharedDataProxyList, GlobalDataStore, TRANSPORT_UNIX_SOCKET, NamespacePolicy, \
+    SharedNamespaces, CONNECTION_ERRORS
+from python_utils.flask.shared_socket import UnixSocketDataClient
+from python_utils.flask.tiered_cache import TieredCache, GlobalDataStoreCache
+
+
+def get_free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
 
 
 class TestSharedDataProxy(unittest.TestCase):
@@ -11,20 +24,26 @@ class TestSharedDataProxy(unittest.TestCase):
 
     def test_set_item(self):
         self.proxy['key1'] = {'inner_key': 'value'}
-        self.mock_store.update.assert_called_with('name', {'key1': {'inner_key': 'value'}})
+        self.mock_store.set_item.assert_called_with('name', 'key1', {'inner_key': 'value'})
+        self.mock_store.update.assert_not_called()
 
     def test_get_item(self):
-        self.mock_store.get_data.return_value = {'key1': 'value'}
+        self.mock_store.get_item.return_value = 'value'
         result = self.proxy['key1']
-        self.mock_store.get_data.assert_called()
+        self.mock_store.get_item.assert_called_with('name', 'key1')
+        self.mock_store.get_data.assert_not_called()
         self.assertEqual(result, 'value')
 
+    def test_del_item(self):
+        del self.proxy['key1']
+        self.mock_store.delete_item.assert_called_with('name', 'key1')
+
     def test_len(self):
-        self.mock_store.get_data.return_value = {'key1': 'value1', 'key2': 'value2'}
+        self.mock_store.get_length.return_value = 2
         self.assertEqual(len(self.proxy), 2)
 
     def test_iter(self):
-        self.mock_store.get_data.return_value = {'key1': 'value1', 'key2': 'value2'}
+        self.mock_store.get_keys.return_value = ['key1', 'key2']
         keys = list(iter(self.proxy))
         self.assertEqual(keys, ['key1', 'key2'])
 
@@ -33,10 +52,314 @@ class TestSharedDataProxy(unittest.TestCase):
         self.assertEqual(repr(self.proxy), "{'key1': 'value1', 'key2': 'value2'}")
 
     def test_contains(self):
-        self.mock_store.get_data.return_value = {'key1': 'value1', 'key2': 'value2'}
+        self.mock_store.contains_item.side_effect = lambda name, key: key in {'key1': 'value1', 'key2': 'value2'}
         self.assertTrue('key1' in self.proxy)
         self.assertFalse('key3' in self.proxy)
 
 
+class TestGlobalDataStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = GlobalDataStore(port=get_free_port())
+        cls.store.start()
+        cls.store.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.stop()
+
+    def test_key_operations(self):
+        proxy = SharedDataProxyDict(name="key_operations", global_data_store=self.store)
+        proxy['key1'] = 'value1'
+        proxy['key2'] = 'value2'
+        self.assertEqual(proxy['key1'], 'value1')
+        self.assertIsNone(proxy['missing'])
+        self.assertTrue('key2' in proxy)
+        self.assertEqual(len(proxy), 2)
+
+        del proxy['key1']
+        self.assertFalse('key1' in proxy)
+        self.assertEqual(list(proxy), ['key2'])
+        self.assertEqual(proxy.get_data(), {'key2': 'value2'})
+
+    def test_near_cache(self):
+        worker_1 = SharedDataProxyDict(name="near_cache", global_data_store=self.store, near_cache=True)
+        worker_2 = SharedDataProxyDict(name="near_cache", global_data_store=self.store, near_cache=True)
+        worker_1['token'] = 'secret'
+        self.assertEqual(worker_2['token'], 'secret')
+        self.assertFalse('other' in worker_2)
+
+        lookup_item = self.store.lookup_item
+        self.store.lookup_item = MagicMock(side_effect=lookup_item)
+        try:
+            self.assertEqual(worker_2['token'], 'secret')
+            self.store.lookup_item.assert_not_called()
+            # misses are not cached
+            self.assertFalse('other' in worker_2)
+            self.assertEqual(self.store.lookup_item.call_count, 1)
+
+            worker_1['other'] = 'value'
+            self.assertTrue('other' in worker_2)
+            del worker_1['token']
+            self.assertFalse('token' in worker_2)
+            self.assertEqual(self.store.lookup_item.call_count, 3)
+        finally:
+            self.store.lookup_item = lookup_item
+
+    def test_near_cache_size(self):
+        worker_1 = SharedDataProxyDict(name="near_cache_size", global_data_store=self.store)
+        worker_2 = SharedDataProxyDict(name="near_cache_size", global_data_store=self.store, near_cache=True, near_cache_size=2)
+        worker_1.update({'key1': 'value1', 'key2': 'value2', 'key3': 'value3'})
+        self.assertEqual(worker_2['key1'], 'value1')
+        self.assertEqual(worker_2['key2'], 'value2')
+        self.assertEqual(worker_2['key1'], 'value1')
+        self.assertEqual(worker_2['key3'], 'value3')
+        self.assertEqual(list(worker_2.near_cache), ['key1', 'key3'])
+
+    def test_atomic_operations(self):
+        proxy = SharedDataProxyDict(name="atomic_operations", global_data_store=self.store)
+        proxy.update({'key1': 'value1', 'key2': 'value2'}, key3='value3')
+        self.assertEqual(proxy.get_many(['key1', 'key3', 'missing']), {'key1': 'value1', 'key3': 'value3'})
+
+        self.assertEqual(proxy.increment('counter'), 1)
+        self.assertEqual(proxy.increment('counter', 5), 6)
+        self.assertEqual(proxy.setdefault('key1', 'other'), 'value1')
+        self.assertEqual(proxy.setdefault('key4', 'value4'), 'value4')
+
+        self.assertFalse(proxy.compare_and_swap('key1', 'wrong', 'new'))
+        self.assertTrue(proxy.compare_and_swap('key1', 'value1', 'new'))
+        self.assertTrue(proxy.compare_and_swap('key5', None, 'created'))
+        self.assertEqual(proxy['key1'], 'new')
+        self.assertEqual(proxy['key5'], 'created')
+
+    def test_concurrent_increments(self):
+        from concurrent.futures import ThreadPoolExecutor
+        proxy = SharedDataProxyDict(name="concurrent_increments", global_data_store=self.store)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: proxy.increment('counter'), range(100)))
+        self.assertEqual(proxy['counter'], 100)
+
+    def test_max_size(self):
+        proxy = SharedDataProxyDict(name="max_size", global_data_store=self.store, policy=NamespacePolicy(max_size=2))
+        proxy['key1'] = 'value1'
+        proxy['key2'] = 'value2'
+        self.assertEqual(proxy['key1'], 'value1')
+        proxy['key3'] = 'value3'
+        self.assertEqual(sorted(proxy), ['key1', 'key3'])
+
+    def test_tiered_cache(self):
+        entries = SharedDataProxyDict(name="tiered_cache", global_data_store=self.store, policy=NamespacePolicy(max_size=10))
+        worker1 = TieredCache(GlobalDataStoreCache(entries=entries))
+        worker2 = TieredCache(GlobalDataStoreCache(entries=entries))
+        worker1.set("key", "value")
+        self.assertEqual(worker2.get("key"), "value")
+        self.assertTrue(worker1.add("lock", True, timeout=1))
+        self.assertFalse(worker2.add("lock", True))
+        entries["lock"] = (time.time() - 1, True)
+        self.assertTrue(worker2.add("lock", True))
+
+        # counters are incremented on the server
+        worker1.set("counter", 1)
+        self.assertEqual(worker1.inc("counter"), 2)
+        self.assertEqual(worker2.inc("counter", 3), 5)
+        self.assertEqual(worker1.dec("counter"), 4)
+        self.assertEqual(worker2.get("counter"), 4)
+        self.assertEqual(worker1.inc("new_counter"), 1)
+
+        self.assertTrue(worker1.delete("new_counter"))
+        self.assertFalse(worker1.delete("new_counter"))
+        self.assertTrue(worker1.clear())
+        self.assertEqual(len(entries), 0)
+        self.assertIsNone(worker2.shared_tier.get("key"))
+
+    def test_ttl(self):
+        proxy = SharedDataProxyDict(name="ttl", global_data_store=self.store, policy=NamespacePolicy(ttl=0.5))
+        near_cache_proxy = SharedDataProxyDict(name="ttl", global_data_store=self.store, near_cache=True,
+                                               policy=NamespacePolicy(ttl=0.5))
+        proxy['key1'] = 'value1'
+        proxy['key2'] = 'value2'
+        self.assertEqual(near_cache_proxy['key2'], 'value2')
+        for _ in range(4):
+            time.sleep(0.2)
+            self.assertEqual(proxy['key1'], 'value1')
+
+        self.assertFalse('key2' in near_cache_proxy)
+        self.assertEqual(list(proxy), ['key1'])
+        time.sleep(0.6)
+        self.assertEqual(len(proxy), 0)
+
+    def test_not_sliding_ttl(self):
+        proxy = SharedDataProxyDict(name="not_sliding_ttl", global_data_store=self.store,
+                                    policy=NamespacePolicy(ttl=0.3, sliding=False))
+        proxy['key1'] = 'value1'
+        time.sleep(0.2)
+        self.assertTrue('key1' in proxy)
+        time.sleep(0.2)
+        self.assertFalse('key1' in proxy)
+
+    def test_list_operations(self):
+        proxy = SharedDataProxyList(name="list_operations", global_data_store=self.store)
+        proxy.append('a')
+        proxy.extend(['b', 'c', 'd'])
+        proxy.insert(0, 'start')
+        self.assertEqual(proxy[1], 'a')
+        self.assertEqual(proxy[1:3], ['a', 'b'])
+        self.assertEqual(proxy.pop(), 'd')
+        self.assertEqual(proxy.pop(0), 'start')
+
+        proxy[0] = 'A'
+        del proxy[1]
+        self.assertTrue('c' in proxy)
+        self.assertFalse('b' in proxy)
+        self.assertEqual(list(proxy), ['A', 'c'])
+        with self.assertRaises(IndexError):
+            del proxy[5]
+
+        proxy.clear()
+        self.assertEqual(len(proxy), 0)
+
+    def test_ring_buffer(self):
+        proxy = SharedDataProxyList(name="ring_buffer", global_data_store=self.store, max_length=3)
+        proxy.extend([1, 2, 3])
+        proxy.append(4)
+        self.assertEqual(proxy.get_data(), [2, 3, 4])
+        self.assertEqual(proxy[-2:], [3, 4])
+        self.assertEqual(proxy.pop(0), 2)
+
+        proxy[0:1] = [30, 31]
+        self.assertEqual(proxy.get_data(), [30, 31, 4])
+
+        # inserted at the index of the full buffer, then the oldest entry is dropped
+        proxy.insert(2, 40)
+        self.assertEqual(proxy.get_data(), [31, 40, 4])
+        proxy.insert(-1, 50)
+        self.assertEqual(proxy.get_data(), [40, 50, 4])
+
+    def test_connection_per_thread(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            connections = list(executor.map(lambda _: id(self.store.shared_namespaces), range(2)))
+        self.assertNotEqual(id(self.store.shared_namespaces), connections[0])
+
+    def test_reconnect(self):
+        port = get_free_port()
+        server = self.create_store(port)
+        server.start()
+        client = self.create_store(port)
+        client.connect()
+        proxy = SharedDataProxyDict(name="reconnect", global_data_store=client, near_cache=True)
+        proxy['key1'] = 'value1'
+        self.assertEqual(proxy['key1'], 'value1')
+
+        server.stop()
+        server = self.create_store(port)
+        server.start()
+        try:
+            self.assertIsNone(proxy['key1'])
+            proxy['key2'] = 'value2'
+            self.assertEqual(proxy['key2'], 'value2')
+        finally:
+            server.stop()
+
+    def create_store(self, port: int) -> GlobalDataStore:
+        return GlobalDataStore(port=port)
+
+    def test_metrics(self):
+        self.store.configure_metrics(payload_sizes=True)
+        try:
+            proxy = SharedDataProxyDict(name="metrics", global_data_store=self.store)
+            proxy['key1'] = 'value1'
+            proxy['key1']
+            proxy['key1']
+        finally:
+            self.store.configure_metrics()
+
+        metrics = self.store.get_metrics()
+        for side in ["client", "server"]:
+            get_item = metrics[side]["metrics"]["get_item"]
+            self.assertEqual(get_item["count"], 2)
+            self.assertEqual(sum(bucket["count"] for bucket in get_item["histogram"]), 2)
+            self.assertGreater(get_item["response_bytes"], 0)
+            self.assertEqual(metrics[side]["metrics"]["set_item"]["count"], 1)
+
+
+class TestSharedNamespaces(unittest.TestCase):
+
+    def test_evict(self):
+        shared_namespaces = SharedNamespaces({})
+        shared_namespaces.update_many("evict", {"key1": 1, "key2": 2, "key3": 3})
+        version = shared_namespaces.get_version("evict")
+        shared_namespaces.configure_namespace("evict", max_size=2)
+        self.assertEqual(shared_namespaces.get_keys("evict"), ["key2", "key3"])
+        self.assertEqual(shared_namespaces.get_version("evict"), version + 1)
+
+    def test_sweep(self):
+        shared_namespaces = SharedNamespaces({})
+        shared_namespaces.SWEEP_INTERVAL = 3600
+        shared_namespaces.set_item("sweep", "existing", "value")
+        shared_namespaces.configure_namespace("sweep", ttl=0.1)
+        shared_namespaces.set_item("sweep", "key1", "value1")
+        version = shared_namespaces.get_version("sweep")
+
+        time.sleep(0.2)
+        self.assertEqual(shared_namespaces.sweep(), 2)
+        self.assertEqual(shared_namespaces.namespaces["sweep"], {})
+        self.assertEqual(shared_namespaces.get_version("sweep"), version + 1)
+
+
+class TestUnixSocketGlobalDataStore(TestGlobalDataStore):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = GlobalDataStore(port=get_free_port(), transport=TRANSPORT_UNIX_SOCKET)
+        cls.store.start()
+        cls.store.connect()
+
+    def create_store(self, port: int) -> GlobalDataStore:
+        return GlobalDataStore(port=port, transport=TRANSPORT_UNIX_SOCKET)
+
+    def test_pipeline(self):
+        with self.store.shared_namespaces.pipeline() as pipeline:
+            pipeline.set_item("pipeline", "key1", "value1")
+            pipeline.increment("pipeline", "counter")
+            pipeline.get_item("pipeline", "key1")
+        self.assertEqual(pipeline.results, [None, 1, "value1"])
+
+    def test_reconnect_without_repeat(self):
+        port = get_free_port()
+        server = self.create_store(port)
+        server.start()
+        client = self.create_store(port)
+        client.connect()
+        self.assertEqual(client.call("increment", "repeat", "counter"), 1)
+
+        server.stop()
+        server = self.create_store(port)
+        server.start()
+        try:
+            # not repeated, the increment may have been executed before the connection was lost
+            with self.assertRaises(CONNECTION_ERRORS):
+                client.call("increment", "repeat", "counter")
+            self.assertEqual(client.call("increment", "repeat", "counter"), 1)
+
+            # reads are repeated on a new connection
+            server.stop()
+            server = self.create_store(port)
+            server.start()
+            self.assertIsNone(client.call("get_item", "repeat", "counter"))
+        finally:
+            server.stop()
+
+    def test_private_socket(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.store.socket_directory).st_mode), 0o700)
+        self.assertEqual(stat.S_IMODE(os.stat(self.store.socket_path).st_mode), 0o600)
+
+    def test_wrong_authkey(self):
+        client = UnixSocketDataClient(self.store.socket_path, b"wrong")
+        with self.assertRaises(Exception):
+            client.get_item("authkey", "key")
+
+
 if __name__ == '__main__':
     unittest.main()
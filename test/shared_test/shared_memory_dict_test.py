@@ -0,0 +1,63 @@
+import os
+import unittest
+from multiprocessing import get_context
+from unittest.mock import patch
+from python_utils.flask.shared_memory_store import SharedMemoryDict, RUN_ID_VARIABLE
+
+
+def write_in_other_process(name: str):
+    shared = SharedMemoryDict(name)
+    shared["from_other_process"] = "value"
+    shared.pointer.close()
+
+
+class TestSharedMemoryDict(unittest.TestCase):
+
+    def setUp(self):
+        self.shared = SharedMemoryDict("shared_memory_dict_test")
+
+    def tearDown(self):
+        self.shared.release()
+
+    def test_read_write(self):
+        self.assertEqual(len(self.shared), 0)
+        self.shared["key1"] = "value1"
+        self.shared.update({"key2": "value2", "key3": "value3"})
+        del self.shared["key3"]
+
+        self.assertEqual(self.shared["key1"], "value1")
+        self.assertIsNone(self.shared["missing"])
+        self.assertTrue("key2" in self.shared)
+        self.assertEqual(sorted(self.shared), ["key1", "key2"])
+        self.assertEqual(self.shared.get_version(), 3)
+
+    def test_other_reader_sees_new_version(self):
+        reader = SharedMemoryDict("shared_memory_dict_test")
+        self.shared["key1"] = "value1"
+        self.assertEqual(reader["key1"], "value1")
+
+        version, data = reader.snapshot
+        self.assertIs(reader.get_data(), data)
+
+        self.shared["key1"] = "value2"
+        self.assertEqual(reader["key1"], "value2")
+        self.assertEqual(reader.snapshot[0], version + 1)
+
+    def test_write_from_other_process(self):
+        process = get_context("spawn").Process(target=write_in_other_process, args=("shared_memory_dict_test",))
+        process.start()
+        process.join()
+        self.assertEqual(self.shared["from_other_process"], "value")
+
+    def test_run_id(self):
+        # the segments of another run are not found
+        self.shared["key1"] = "value1"
+        with patch.dict(os.environ, {RUN_ID_VARIABLE: "next_run"}):
+            next_run = SharedMemoryDict("shared_memory_dict_test")
+            self.assertIsNone(next_run["key1"])
+            next_run.release()
+        self.assertEqual(self.shared["key1"], "value1")
+
+
+if __name__ == '__main__':
+    unittest.main()
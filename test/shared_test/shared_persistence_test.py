@@ -0,0 +1,118 @@
+import os
+import tempfile
+import time
+import unittest
+from python_utils.flask.shared import SharedNamespaces, shared_dict
+from python_utils.flask.shared_persistence import read_records, LOG_FILENAME, SNAPSHOT_FILENAME
+
+
+class TestNamespacePersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_shared_namespaces(self, ttl: float = None) -> SharedNamespaces:
+        shared_namespaces = SharedNamespaces({})
+        shared_namespaces.configure_namespace("tokens", ttl=ttl, persistent=True)
+        shared_namespaces.enable_persistence(self.directory.name, interval=3600)
+        return shared_namespaces
+
+    def test_log_and_restore(self):
+        shared_namespaces = self.create_shared_namespaces()
+        shared_namespaces.update_many("tokens", {"id1": "token1", "id2": "token2"})
+        shared_namespaces.set_item("other", "key", "value")
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+
+        shared_namespaces.set_item("tokens", "id3", "token3")
+        shared_namespaces.set_item("tokens", "id3", "token3b")
+        shared_namespaces.delete_item("tokens", "id1")
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+
+        records = read_records(os.path.join(self.directory.name, LOG_FILENAME))
+        self.assertEqual(sorted(record[2] for record in records if record[0] != "reset"), ["id1", "id1", "id2", "id3"])
+        self.assertFalse(any(record[1] == "other" for record in records))
+
+        restored_namespaces = self.create_shared_namespaces()
+        self.assertEqual(restored_namespaces.get_data("tokens"), {"id2": "token2", "id3": "token3b"})
+        self.assertIsNone(restored_namespaces.get_data("other"))
+
+    def test_compaction(self):
+        shared_namespaces = self.create_shared_namespaces()
+        shared_namespaces.set_item("tokens", "id1", "token1")
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+        shared_namespaces.set_item("tokens", "id2", "token2")
+        shared_namespaces.release()
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, SNAPSHOT_FILENAME)))
+        self.assertEqual(read_records(os.path.join(self.directory.name, LOG_FILENAME)), [])
+
+        restored_namespaces = self.create_shared_namespaces()
+        self.assertEqual(restored_namespaces.get_data("tokens"), {"id1": "token1", "id2": "token2"})
+
+        restored_namespaces.delete_namespace("tokens")
+        restored_namespaces.persistence.flush(restored_namespaces.collect)
+        self.assertEqual(self.create_shared_namespaces().get_data("tokens"), {})
+
+    def test_restore_expiry_times(self):
+        shared_namespaces = self.create_shared_namespaces(ttl=3600)
+        shared_namespaces.set_item("tokens", "id1", "token1")
+        expiry_time = shared_namespaces.expiry_times["tokens"]["id1"]
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+
+        time.sleep(0.01)
+        restored_namespaces = self.create_shared_namespaces(ttl=3600)
+        self.assertEqual(restored_namespaces.expiry_times["tokens"]["id1"], expiry_time)
+
+        restored_namespaces.release()
+        self.assertEqual(self.create_shared_namespaces(ttl=3600).expiry_times["tokens"]["id1"], expiry_time)
+
+    def test_log_slid_expiry_times(self):
+        shared_namespaces = self.create_shared_namespaces(ttl=1)
+        shared_namespaces.set_item("tokens", "id1", "token1")
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+        log_filename = os.path.join(self.directory.name, LOG_FILENAME)
+        record_count = len(read_records(log_filename))
+
+        # slid by less than a tenth of the ttl: not logged again
+        self.assertTrue(shared_namespaces.touch("tokens", "id1"))
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+        self.assertEqual(len(read_records(log_filename)), record_count)
+
+        time.sleep(0.15)
+        self.assertTrue(shared_namespaces.touch("tokens", "id1"))
+        expiry_time = shared_namespaces.expiry_times["tokens"]["id1"]
+        shared_namespaces.persistence.flush(shared_namespaces.collect)
+        self.assertEqual(len(read_records(log_filename)), record_count + 1)
+
+        # restored without a snapshot, like after a crash
+        restored_namespaces = self.create_shared_namespaces(ttl=1)
+        self.assertEqual(restored_namespaces.expiry_times["tokens"]["id1"], expiry_time)
+
+    def test_restore_only_persistent_namespaces(self):
+        shared_namespaces = self.create_shared_namespaces()
+        shared_namespaces.set_item("tokens", "id1", "token1")
+        shared_namespaces.release()
+
+        unconfigured_namespaces = SharedNamespaces({})
+        unconfigured_namespaces.enable_persistence(self.directory.name, interval=3600)
+        self.assertIsNone(unconfigured_namespaces.get_data("tokens"))
+        self.assertFalse(unconfigured_namespaces.is_persistent("tokens"))
+        # kept for a later start, which configures the namespace again
+        unconfigured_namespaces.release()
+
+        restored_namespaces = SharedNamespaces({})
+        restored_namespaces.enable_persistence(self.directory.name, interval=3600)
+        restored_namespaces.configure_namespace("tokens", persistent=True)
+        self.assertTrue(restored_namespaces.is_persistent("tokens"))
+        self.assertEqual(restored_namespaces.get_data("tokens"), {"id1": "token1"})
+
+    def test_persistent_shared_dict_requires_name(self):
+        with self.assertRaises(Exception):
+            shared_dict(persistent=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
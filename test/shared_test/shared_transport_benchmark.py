@@ -0,0 +1,46 @@
+import socket
+import time
+from python_utils.flask.shared import GlobalDataStore, SharedDataProxyDict, TRANSPORT_MANAGER, TRANSPORT_UNIX_SOCKET
+
+OPERATIONS = 5000
+
+
+def get_free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
+
+
+def measure(name: str, operation) -> float:
+    start_time = time.perf_counter()
+    for index in range(OPERATIONS):
+        operation(index)
+    duration = time.perf_counter() - start_time
+    operations_per_second = OPERATIONS / duration
+    print(f"{name:<40} {operations_per_second:>10.0f} ops/s")
+    return operations_per_second
+
+
+def benchmark(transport: str):
+    store = GlobalDataStore(port=get_free_port(), transport=transport)
+    store.start()
+    store.connect()
+    try:
+        tokens = SharedDataProxyDict(name="tokens", global_data_store=store)
+        measure(f"[{transport}] set", lambda index: tokens.__setitem__(f"auth_{index % 100}", "token"))
+        measure(f"[{transport}] get", lambda index: tokens[f"auth_{index % 100}"])
+        measure(f"[{transport}] contains", lambda index: f"auth_{index % 100}" in tokens)
+        if transport == TRANSPORT_UNIX_SOCKET:
+            def pipelined_get(index: int):
+                if index % 100 == 0:
+                    with store.shared_namespaces.pipeline() as pipeline:
+                        for key_index in range(100):
+                            pipeline.get_item("tokens", f"auth_{key_index}")
+            measure(f"[{transport}] get (pipelined by 100)", pipelined_get)
+    finally:
+        store.stop()
+
+
+if __name__ == '__main__':
+    benchmark(TRANSPORT_MANAGER)
+    benchmark(TRANSPORT_UNIX_SOCKET)